@@ -1,8 +1,15 @@
 import aiohttp
-import json
+import asyncio
 import logging
+import orjson
+from collections import OrderedDict
+from typing import Awaitable, Callable, TypeVar
 from core.redis.providers import CacheService
+from blockchain.utils import to_checksum_address
 from web3 import AsyncWeb3
+from web3.contract import AsyncContract
+
+T = TypeVar("T")
 
 
 class ABIService:
@@ -15,6 +22,8 @@ class ABIService:
         Cache service for storing ABIs
     logger : logging.Logger
         Logger instance
+    session : aiohttp.ClientSession
+        Shared HTTP session for explorer requests
     """
     
     EXPLORER_APIS = {
@@ -22,9 +31,92 @@ class ABIService:
         "ethereum": "https://api.etherscan.io/api"
     }
     
-    def __init__(self, cache_service: CacheService, logger: logging.Logger):
+    CONTRACT_CACHE_SIZE = 1024
+    
+    # Негативный кеш для неверифицированных контрактов: 10 минут, после 3 промахов подряд — сутки
+    MISS_TTL = 600
+    MISS_TTL_LONG = 86400
+    MISS_ESCALATE_AFTER = 3
+    
+    ABI_TTL = 86400 * 7
+    # Адрес имплементации живёт недолго: апгрейд прокси виден не позже чем через час
+    IMPLEMENTATION_TTL = 3600
+    # Вызов implementation() нужен только для прокси не по EIP-1967: лишний bind ABI + eth_call
+    IMPLEMENTATION_CALL_FALLBACK = True
+    
+    _PROXY_FUNCTIONS = frozenset({'implementation', 'upgradeTo', 'upgradeToAndCall'})
+    
+    # Бесплатный тариф Etherscan/Snowtrace: 5 запросов в секунду
+    EXPLORER_CONCURRENCY = 4
+    EXPLORER_RATE_LIMIT = 5
+    EXPLORER_MAX_RETRIES = 3
+    EXPLORER_BACKOFF_BASE = 0.5
+    
+    def __init__(
+        self,
+        cache_service: CacheService,
+        logger: logging.Logger,
+        session: aiohttp.ClientSession
+    ):
         self.cache = cache_service
         self.logger = logger
+        self._session = session
+        self._semaphores = {
+            network: asyncio.Semaphore(self.EXPLORER_CONCURRENCY)
+            for network in self.EXPLORER_APIS
+        }
+        self._next_request_at = {network: 0.0 for network in self.EXPLORER_APIS}
+        # Запросы в процессе выполнения: одновременные промахи кеша ждут один и тот же запрос
+        self._inflight: dict[str, asyncio.Future] = {}
+        # (network, checksum_address) -> (abi, contract factory)
+        self._contracts: OrderedDict[
+            tuple[str, str], tuple[list[dict[str, any]], type[AsyncContract]]
+        ] = OrderedDict()
+    
+    async def get_contract(
+        self,
+        web3_client: AsyncWeb3,
+        contract_address: str,
+        network: str,
+        api_key: str
+    ) -> type[AsyncContract]:
+        """
+        Get contract factory bound to the contract ABI.
+        
+        The factory is built once per (network, address) and reused while
+        the ABI stays the same, so web3 does not re-parse the ABI on every request.
+        
+        Parameters
+        ----------
+        web3_client : AsyncWeb3
+            Web3 client for the network
+        contract_address : str
+            Contract address
+        network : str
+            Network name
+        api_key : str
+            Explorer API key
+            
+        Returns
+        -------
+        type[AsyncContract]
+            Contract factory (implementation ABI if proxy)
+        """
+        abi = await self.get_abi(contract_address, network, api_key, web3_client)
+        checksum_address = to_checksum_address(contract_address)
+        key = (network, checksum_address)
+        
+        cached = self._contracts.get(key)
+        if cached and cached[0] == abi:
+            self._contracts.move_to_end(key)
+            return cached[1]
+        
+        contract = web3_client.eth.contract(address=checksum_address, abi=abi)
+        self._contracts[key] = (abi, contract)
+        if len(self._contracts) > self.CONTRACT_CACHE_SIZE:
+            self._contracts.popitem(last=False)
+        
+        return contract
     
     async def get_abi(
         self,
@@ -37,6 +129,10 @@ class ABIService:
         Get contract ABI from explorer API or cache.
         For proxy contracts, attempts to get implementation ABI.
         
+        A proxy's own ABI is cached separately from its implementation's, so
+        the implementation address is resolved on every call and an upgrade
+        shows up once the address cache expires.
+        
         Parameters
         ----------
         contract_address : str
@@ -55,39 +151,163 @@ class ABIService:
         """
         cache_key = f"abi:{network}:{contract_address.lower()}"
         
-        self.logger.info(f"get_abi called for {contract_address} on {network}")
+        self.logger.info("get_abi called for %s on %s", contract_address, network)
         
         cached = await self.cache.get(cache_key)
         if cached and isinstance(cached, list):
-            self.logger.info(f"ABI found in cache for {contract_address}")
+            self.logger.info("ABI found in cache for %s", contract_address)
             return cached
+        if isinstance(cached, dict) and cached.get("__miss__"):
+            self.logger.info("ABI for %s is cached as unavailable", contract_address)
+            return []
+        if isinstance(cached, dict) and "__proxy__" in cached:
+            if not web3_client:
+                return cached["__proxy__"]
+            return await self._get_proxy_abi(
+                contract_address, network, api_key, web3_client, cached["__proxy__"]
+            )
         
+        return await self._single_flight(
+            cache_key,
+            lambda: self._load_abi(cache_key, contract_address, network, api_key, web3_client)
+        )
+    
+    async def _load_abi(
+        self,
+        cache_key: str,
+        contract_address: str,
+        network: str,
+        api_key: str,
+        web3_client: AsyncWeb3
+    ) -> list[dict[str, any]]:
+        """
+        Load ABI from explorer (resolving proxies) and store it in cache.
+        
+        Parameters
+        ----------
+        cache_key : str
+            Cache key for the ABI
+        contract_address : str
+            Contract address
+        network : str
+            Network name
+        api_key : str
+            Explorer API key
+        web3_client : AsyncWeb3
+            Web3 client for reading implementation address
+            
+        Returns
+        -------
+        list[dict[str, any]]
+            Contract ABI (implementation ABI if proxy)
+        """
         abi = await self._fetch_from_explorer(contract_address, network, api_key)
+        if abi is None:
+            return []
+        if not abi:
+            await self._remember_miss(cache_key)
+            return []
         
         # Проверяем прокси и пытаемся получить ABI имплементации
-        if abi and web3_client and self._is_proxy_abi(abi):
-            self.logger.info(f"Contract {contract_address} detected as proxy")
-            impl_address = await self._get_implementation_address(
-                contract_address, abi, web3_client
-            )
-            
-            if impl_address:
-                self.logger.info(f"Implementation address found: {impl_address}")
-                impl_abi = await self._fetch_from_explorer(impl_address, network, api_key)
-                if impl_abi:
-                    self.logger.info(f"Implementation ABI loaded: {len(impl_abi)} items")
-                    await self.cache.set(cache_key, impl_abi, ttl=86400 * 7)
-                    return impl_abi
-                else:
-                    self.logger.warning(f"Failed to fetch implementation ABI for {impl_address}")
-            else:
-                self.logger.warning(f"Failed to get implementation address for proxy {contract_address}")
-        
-        if abi:
-            await self.cache.set(cache_key, abi, ttl=86400 * 7)
+        if web3_client and self._is_proxy_abi(abi):
+            self.logger.info("Contract %s detected as proxy", contract_address)
+            await self.cache.set(cache_key, {"__proxy__": abi}, ttl=self.ABI_TTL)
+            return await self._get_proxy_abi(contract_address, network, api_key, web3_client, abi)
+        
+        await self.cache.set(cache_key, abi, ttl=self.ABI_TTL)
         
         return abi
     
+    async def _get_proxy_abi(
+        self,
+        proxy_address: str,
+        network: str,
+        api_key: str,
+        web3_client: AsyncWeb3,
+        proxy_abi: list[dict[str, any]]
+    ) -> list[dict[str, any]]:
+        """
+        Get ABI of the current proxy implementation.
+        
+        The implementation ABI is cached under the implementation address.
+        
+        Parameters
+        ----------
+        proxy_address : str
+            Proxy contract address
+        network : str
+            Network name
+        api_key : str
+            Explorer API key
+        web3_client : AsyncWeb3
+            Web3 client for reading implementation address
+        proxy_abi : list[dict[str, any]]
+            Proxy contract ABI
+            
+        Returns
+        -------
+        list[dict[str, any]]
+            Implementation ABI, or proxy ABI if the implementation is unknown
+        """
+        impl_address = await self._get_implementation_address(
+            proxy_address, network, proxy_abi, web3_client
+        )
+        if not impl_address:
+            self.logger.warning("Failed to get implementation address for proxy %s", proxy_address)
+            return proxy_abi
+        
+        self.logger.info("Implementation address found: %s", impl_address)
+        # Без web3_client: ABI имплементации не разворачиваем как прокси ещё раз
+        impl_abi = await self.get_abi(impl_address, network, api_key, None)
+        if not impl_abi:
+            self.logger.warning("Failed to fetch implementation ABI for %s", impl_address)
+            return proxy_abi
+        
+        return impl_abi
+    
+    async def _remember_miss(self, cache_key: str) -> None:
+        """
+        Cache that the contract has no verified ABI.
+        
+        The sentinel TTL grows after several consecutive misses.
+        
+        Parameters
+        ----------
+        cache_key : str
+            Cache key for the ABI
+        """
+        misses_key = f"{cache_key}:misses"
+        previous = await self.cache.get(misses_key)
+        misses = (previous or {}).get("count", 0) + 1
+        await self.cache.set(misses_key, {"count": misses}, ttl=self.MISS_TTL_LONG * 2)
+        
+        ttl = self.MISS_TTL if misses < self.MISS_ESCALATE_AFTER else self.MISS_TTL_LONG
+        await self.cache.set(cache_key, {"__miss__": True}, ttl=ttl)
+    
+    async def _single_flight(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run the coroutine once per key, sharing its result with concurrent callers.
+        
+        Parameters
+        ----------
+        key : str
+            Deduplication key
+        factory : Callable[[], Awaitable[T]]
+            Creates the coroutine to run if nothing is in flight for the key
+            
+        Returns
+        -------
+        T
+            Result of the shared coroutine
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: отмена одного из ожидающих не отменяет общий запрос
+        return await asyncio.shield(future)
+    
     def _is_proxy_abi(self, abi: list[dict[str, any]]) -> bool:
         """
         Check if ABI looks like a proxy contract.
@@ -102,30 +322,27 @@ class ABIService:
         bool
             True if ABI contains proxy patterns
         """
-        proxy_functions = ['implementation', 'upgradeTo', 'upgradeToAndCall']
         function_names = {item['name'] for item in abi if item.get('type') == 'function' and 'name' in item}
-        
-        self.logger.info(f"Checking if proxy: functions in ABI = {function_names}")
-        
         # Если есть хотя бы 2 из этих функций - скорее всего прокси
-        matches = sum(1 for pf in proxy_functions if pf in function_names)
-        self.logger.info(f"Proxy function matches: {matches}/3 - is_proxy={matches >= 2}")
-        return matches >= 2
+        return len(self._PROXY_FUNCTIONS & function_names) >= 2
     
     async def _get_implementation_address(
         self,
         proxy_address: str,
+        network: str,
         proxy_abi: list[dict[str, any]],
         web3_client
     ) -> str | None:
         """
         Get implementation address from proxy contract.
-        Tries multiple methods: EIP-1967 storage slot, then implementation() function.
+        Tries multiple methods: cache, EIP-1967 storage slot, then implementation() function.
         
         Parameters
         ----------
         proxy_address : str
             Proxy contract address
+        network : str
+            Network name
         proxy_abi : list[dict[str, any]]
             Proxy contract ABI
         web3_client : AsyncWeb3
@@ -136,35 +353,47 @@ class ABIService:
         str | None
             Implementation address or None
         """
-        checksum_address = web3_client.to_checksum_address(proxy_address)
+        impl_cache_key = f"impl:{network}:{proxy_address.lower()}"
+        cached = await self.cache.get(impl_cache_key)
+        if cached and cached.get("address"):
+            return cached["address"]
+        
+        checksum_address = to_checksum_address(proxy_address)
         
         # Метод 1: EIP-1967 storage slot для implementation
         # keccak256("eip1967.proxy.implementation") - 1
         IMPLEMENTATION_SLOT = "0x360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc"
         
         try:
-            self.logger.info(f"Reading implementation from EIP-1967 storage slot")
+            self.logger.info("Reading implementation from EIP-1967 storage slot")
             storage_value = await web3_client.eth.get_storage_at(checksum_address, IMPLEMENTATION_SLOT)
-            impl_address = web3_client.to_checksum_address("0x" + storage_value.hex()[-40:])
+            impl_bytes = bytes(storage_value[-20:])
             
-            # Проверяем что это не нулевой адрес
-            if impl_address != "0x0000000000000000000000000000000000000000":
-                self.logger.info(f"Implementation address from storage: {impl_address}")
+            # Нулевой адрес отсекаем по сырым байтам, checksum считаем только для настоящего
+            if any(impl_bytes):
+                impl_address = to_checksum_address("0x" + impl_bytes.hex())
+                self.logger.info("Implementation address from storage: %s", impl_address)
+                await self.cache.set(impl_cache_key, {"address": impl_address}, ttl=self.IMPLEMENTATION_TTL)
                 return impl_address
         except Exception as e:
-            self.logger.warning(f"Failed to read from EIP-1967 slot: {e}")
+            self.logger.warning("Failed to read from EIP-1967 slot: %s", e)
+        
+        if not self.IMPLEMENTATION_CALL_FALLBACK:
+            return None
         
         # Метод 2: Вызов функции implementation()
         try:
             contract = web3_client.eth.contract(address=checksum_address, abi=proxy_abi)
             
             if hasattr(contract.functions, 'implementation'):
-                self.logger.info(f"Calling implementation() on {proxy_address}")
+                self.logger.info("Calling implementation() on %s", proxy_address)
                 impl_address = await contract.functions.implementation().call()
-                self.logger.info(f"implementation() returned: {impl_address}")
+                self.logger.info("implementation() returned: %s", impl_address)
+                if impl_address:
+                    await self.cache.set(impl_cache_key, {"address": impl_address}, ttl=self.IMPLEMENTATION_TTL)
                 return impl_address
         except Exception as e:
-            self.logger.warning(f"Error calling implementation(): {e}")
+            self.logger.warning("Error calling implementation(): %s", e)
         
         return None
     
@@ -173,9 +402,9 @@ class ABIService:
         contract_address: str,
         network: str,
         api_key: str
-    ) -> list[dict[str, any]]:
+    ) -> list[dict[str, any]] | None:
         """
-        Fetch ABI from blockchain explorer API.
+        Fetch ABI from blockchain explorer API, deduplicating concurrent requests.
         
         Parameters
         ----------
@@ -188,12 +417,42 @@ class ABIService:
             
         Returns
         -------
-        list[dict[str, any]]
-            Contract ABI
+        list[dict[str, any]] | None
+            Contract ABI, empty list if the contract is not verified,
+            None if the explorer could not be queried or rejected the request
+        """
+        return await self._single_flight(
+            f"explorer:{network}:{contract_address.lower()}",
+            lambda: self._request_explorer(contract_address, network, api_key)
+        )
+    
+    async def _request_explorer(
+        self,
+        contract_address: str,
+        network: str,
+        api_key: str
+    ) -> list[dict[str, any]] | None:
+        """
+        Request ABI from blockchain explorer API.
+        
+        Parameters
+        ----------
+        contract_address : str
+            Contract address
+        network : str
+            Network name
+        api_key : str
+            Explorer API key
+            
+        Returns
+        -------
+        list[dict[str, any]] | None
+            Contract ABI, empty list if the contract is not verified,
+            None if the explorer could not be queried or rejected the request
         """
         api_url = self.EXPLORER_APIS.get(network)
         if not api_url:
-            return []
+            return None
         
         params = {
             "module": "contract",
@@ -202,15 +461,80 @@ class ABIService:
             "apikey": api_key
         }
         
+        for attempt in range(self.EXPLORER_MAX_RETRIES + 1):
+            delay = self.EXPLORER_BACKOFF_BASE * 2 ** attempt
+            
+            async with self._semaphores[network]:
+                await self._throttle(network)
+                try:
+                    async with self._session.get(api_url, params=params) as response:
+                        if response.status == 200:
+                            # Тело читаем один раз байтами: без декодирования в str и stdlib json
+                            data = orjson.loads(await response.read())
+                            if data.get("status") == "1" and data.get("result"):
+                                return orjson.loads(data["result"])
+                            result = str(data.get("result", ""))
+                            # Негативно кешируется только «не верифицирован»: ошибка ключа или API — не свойство контракта
+                            if "not verified" in result.lower():
+                                return []
+                            # Explorer отдаёт rate limit как 200 со status=0
+                            if "rate limit" not in result.lower():
+                                self.logger.warning(
+                                    "Explorer %s rejected request for %s: %s",
+                                    network, contract_address, result
+                                )
+                                return None
+                            self.logger.warning("Explorer %s rate limit reached", network)
+                        else:
+                            self.logger.warning(
+                                "Explorer %s returned %s for %s",
+                                network, response.status, contract_address
+                            )
+                            if response.status != 429 and response.status < 500:
+                                return None
+                            delay = self._parse_retry_after(response.headers.get("Retry-After"), delay)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    self.logger.warning("Explorer request failed for %s: %s", contract_address, e)
+            
+            if attempt < self.EXPLORER_MAX_RETRIES:
+                await asyncio.sleep(delay)
+        
+        return None
+    
+    async def _throttle(self, network: str) -> None:
+        """
+        Space out explorer requests to stay under the per-network rate limit.
+        
+        Parameters
+        ----------
+        network : str
+            Network name
+        """
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_request_at[network])
+        self._next_request_at[network] = slot + 1 / self.EXPLORER_RATE_LIMIT
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    @staticmethod
+    def _parse_retry_after(value: str | None, default: float) -> float:
+        """
+        Parse Retry-After header value.
+        
+        Parameters
+        ----------
+        value : str | None
+            Header value in seconds
+        default : float
+            Delay to use if header is missing or not numeric
+            
+        Returns
+        -------
+        float
+            Delay in seconds
+        """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("status") == "1" and data.get("result"):
-                            return json.loads(data["result"])
-        except Exception:
-            pass
-        
-        return []
+            return max(float(value), 0.0)
+        except (TypeError, ValueError):
+            return default
 
@@ -1,8 +1,15 @@
+import aiohttp
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dishka import Provider, Scope, provide, FromComponent
-from blockchain.services import Web3Service
+from blockchain.services import Web3Service, init_decode_worker
 from blockchain.abi_service import ABIService
-from blockchain.usecases import GetWalletBalanceUseCase, GetContractEventsUseCase
-from typing import Annotated
+from blockchain.usecases import (
+    GetWalletBalanceUseCase,
+    GetWalletBalancesUseCase,
+    GetContractEventsUseCase
+)
+from typing import Annotated, AsyncIterable, Iterable
 from web3 import AsyncWeb3
 from core.environment.config import Settings
 from core.redis.providers import CacheService
@@ -17,28 +24,75 @@ class BlockchainProvider(Provider):
     component = "blockchain"
     
     @provide(scope=Scope.APP)
-    def get_web3_clients(
+    async def get_web3_clients(
         self,
         settings: Annotated[Settings, FromComponent("environment")]
-    ) -> dict[str, AsyncWeb3]:
+    ) -> AsyncIterable[dict[str, AsyncWeb3]]:
         """
         Provide Web3 clients for different networks.
         
+        All providers share one pooled aiohttp session instead of lazily
+        creating their own, so keep-alive connections are reused.
+        
         Parameters
         ----------
         settings : Settings
             Application settings
             
-        Returns
-        -------
+        Yields
+        ------
         dict[str, AsyncWeb3]
             Dictionary of Web3 clients
         """
         networks = ["avalanche", "ethereum"]
-        return {
-            network: AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(settings.get_rpc_url(network)))
-            for network in networks
-        }
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=200,
+                limit_per_host=50,
+                ttl_dns_cache=600,
+                keepalive_timeout=60
+            )
+        )
+        try:
+            clients = {}
+            for network in networks:
+                provider = AsyncWeb3.AsyncHTTPProvider(settings.get_rpc_url(network))
+                await provider.cache_async_session(session)
+                clients[network] = AsyncWeb3(provider)
+            yield clients
+        finally:
+            await session.close()
+    
+    @provide(scope=Scope.APP)
+    def get_decode_executor(
+        self,
+        settings: Annotated[Settings, FromComponent("environment")]
+    ) -> Iterable[Executor]:
+        """
+        Provide process pool for CPU-bound event log decoding.
+        
+        Parameters
+        ----------
+        settings : Settings
+            Application settings
+        
+        Yields
+        ------
+        Executor
+            Process pool executor, shut down on application exit
+        """
+        # fork из многопоточного процесса (uvloop, QueueListener, пулы соединений) может
+        # унести в воркер захваченные блокировки — воркеры стартуют с чистого интерпретатора
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        executor = ProcessPoolExecutor(
+            max_workers=settings.decode_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=init_decode_worker
+        )
+        try:
+            yield executor
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
     
     @provide(scope=Scope.APP)
     def get_web3_service(
@@ -47,7 +101,8 @@ class BlockchainProvider(Provider):
             dict[str, AsyncWeb3], FromComponent("blockchain")
         ],
         logger: Annotated[logging.Logger, FromComponent("logger")],
-        cache_service: Annotated[CacheService, FromComponent("cache")]
+        cache_service: Annotated[CacheService, FromComponent("cache")],
+        decode_executor: Annotated[Executor, FromComponent("blockchain")]
     ) -> Web3Service:
         """
         Provide Web3 service.
@@ -60,6 +115,8 @@ class BlockchainProvider(Provider):
             Logger instance
         cache_service : CacheService
             Cache service instance for chunk caching
+        decode_executor : Executor
+            Process pool for decoding large log chunks
             
         Returns
         -------
@@ -69,8 +126,31 @@ class BlockchainProvider(Provider):
         return Web3Service(
             web3_clients=web3_clients, 
             logger=logger, 
-            cache_service=cache_service
+            cache_service=cache_service,
+            decode_executor=decode_executor
+        )
+    
+    @provide(scope=Scope.APP)
+    async def get_explorer_session(self) -> AsyncIterable[aiohttp.ClientSession]:
+        """
+        Provide pooled HTTP session for blockchain explorer APIs.
+        
+        Yields
+        ------
+        aiohttp.ClientSession
+            HTTP session with keep-alive connection pool
+        """
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit_per_host=20,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
         )
+        try:
+            yield session
+        finally:
+            await session.close()
     
     @provide(scope=Scope.APP)
     def get_abi_service(
@@ -78,7 +158,8 @@ class BlockchainProvider(Provider):
         cache_service: Annotated[
             CacheService, FromComponent("cache")
         ],
-        logger: Annotated[logging.Logger, FromComponent("logger")]
+        logger: Annotated[logging.Logger, FromComponent("logger")],
+        session: Annotated[aiohttp.ClientSession, FromComponent("blockchain")]
     ) -> ABIService:
         """
         Provide ABI service.
@@ -89,13 +170,15 @@ class BlockchainProvider(Provider):
             Cache service instance
         logger : logging.Logger
             Logger instance
+        session : aiohttp.ClientSession
+            Shared HTTP session for explorer requests
             
         Returns
         -------
         ABIService
             ABI service instance
         """
-        return ABIService(cache_service=cache_service, logger=logger)
+        return ABIService(cache_service=cache_service, logger=logger, session=session)
     
     @provide(scope=Scope.REQUEST)
     def get_wallet_balance_use_case(
@@ -123,6 +206,32 @@ class BlockchainProvider(Provider):
             cache_service=cache_service
         )
     
+    @provide(scope=Scope.REQUEST)
+    def get_wallet_balances_use_case(
+        self,
+        web3_service: Annotated[Web3Service, FromComponent("blockchain")],
+        cache_service: Annotated[CacheService, FromComponent("cache")]
+    ) -> GetWalletBalancesUseCase:
+        """
+        Provide get wallet balances (batch) use case.
+        
+        Parameters
+        ----------
+        web3_service : Web3Service
+            Web3 service instance
+        cache_service : CacheService
+            Cache service instance
+            
+        Returns
+        -------
+        GetWalletBalancesUseCase
+            Get wallet balances use case
+        """
+        return GetWalletBalancesUseCase(
+            web3_service=web3_service,
+            cache_service=cache_service
+        )
+    
     @provide(scope=Scope.REQUEST)
     def get_contract_events_use_case(
         self,
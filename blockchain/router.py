@@ -2,13 +2,20 @@ from fastapi import APIRouter
 from dishka.integrations.fastapi import inject
 from dishka import FromComponent
 from typing import Annotated
+from core.responses import ModelJSONResponse
 from blockchain.schemas import (
     GetBalanceRequest,
     BalanceResponse,
+    BatchBalanceRequest,
+    BatchBalanceResponse,
     GetEventsRequest,
     EventsResponse
 )
-from blockchain.usecases import GetWalletBalanceUseCase, GetContractEventsUseCase
+from blockchain.usecases import (
+    GetWalletBalanceUseCase,
+    GetWalletBalancesUseCase,
+    GetContractEventsUseCase
+)
 
 router = APIRouter(
     prefix="/api/blockchain",
@@ -23,13 +30,25 @@ async def get_wallet_balance(
     use_case: Annotated[
         GetWalletBalanceUseCase, FromComponent("blockchain")
     ]
-) -> BalanceResponse:
+) -> ModelJSONResponse:
     """Get wallet balance at specific block."""
-    return await use_case(
+    return ModelJSONResponse(await use_case(
         wallet_address=request.wallet_address,
         block_number=request.block_number,
         network=request.network
-    )
+    ))
+
+
+@router.post("/balance/batch", response_model=BatchBalanceResponse)
+@inject
+async def get_wallet_balances(
+    request: BatchBalanceRequest,
+    use_case: Annotated[
+        GetWalletBalancesUseCase, FromComponent("blockchain")
+    ]
+) -> ModelJSONResponse:
+    """Get balances for many wallets/blocks with one upstream RPC batch."""
+    return ModelJSONResponse(await use_case(items=request.items))
 
 
 @router.post("/events", response_model=EventsResponse)
@@ -39,11 +58,11 @@ async def get_contract_events(
     use_case: Annotated[
         GetContractEventsUseCase, FromComponent("blockchain")
     ]
-) -> EventsResponse:
+) -> ModelJSONResponse:
     """Get all contract events from specified block to current."""
-    return await use_case(
+    return ModelJSONResponse(await use_case(
         contract_address=request.contract_address,
         from_block=request.from_block,
         network=request.network
-    )
+    ))
 
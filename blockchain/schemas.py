@@ -1,7 +1,14 @@
+import re
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Literal
 
 
+# Длину (42) валидаторы проверяют до регулярки, поэтому якоря не нужны;
+# прежний "$" к тому же пропускал адрес с хвостовым переводом строки
+_ADDR_RE = re.compile(r"0x[0-9a-fA-F]{40}")
+MAX_BATCH_BALANCE_ITEMS = 500
+
+
 class GetBalanceRequest(BaseModel):
     """
     Request schema for getting wallet balance.
@@ -25,7 +32,7 @@ class GetBalanceRequest(BaseModel):
     @field_validator('wallet_address')
     @classmethod
     def validate_address(cls, v: str) -> str:
-        if not v.startswith('0x') or len(v) != 42:
+        if len(v) != 42 or not _ADDR_RE.match(v):
             raise ValueError('Invalid Ethereum address format')
         return v.lower()
 
@@ -58,6 +65,39 @@ class BalanceResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BatchBalanceRequest(BaseModel):
+    """
+    Request schema for getting many wallet balances at once.
+    
+    Attributes
+    ----------
+    items : list[GetBalanceRequest]
+        Balance queries (at most MAX_BATCH_BALANCE_ITEMS)
+    """
+    items: list[GetBalanceRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_BALANCE_ITEMS,
+        description="Balance queries"
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BatchBalanceResponse(BaseModel):
+    """
+    Response schema for batch balance query.
+    
+    Attributes
+    ----------
+    balances : list[BalanceResponse]
+        Balances in the same order as requested items
+    """
+    balances: list[BalanceResponse]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class GetEventsRequest(BaseModel):
     """
     Request schema for getting contract events.
@@ -84,7 +124,7 @@ class GetEventsRequest(BaseModel):
     @field_validator('contract_address')
     @classmethod
     def validate_address(cls, v: str) -> str:
-        if not v.startswith('0x') or len(v) != 42:
+        if len(v) != 42 or not _ADDR_RE.match(v):
             raise ValueError('Invalid contract address format')
         return v.lower()
 
@@ -1,10 +1,310 @@
 import asyncio
 import logging
+from concurrent.futures import Executor
 import hashlib
+import pickle
+from bisect import bisect_right
+from functools import partial
+from itertools import chain
+from typing import AsyncIterator
+from weakref import WeakKeyDictionary
+from hexbytes import HexBytes
 from web3 import AsyncWeb3
+from web3._utils.abi import (
+    build_strict_registry,
+    exclude_indexed_event_inputs,
+    get_indexed_event_inputs,
+    map_abi_data,
+    named_tree,
+    normalize_event_input_types
+)
+from web3._utils.events import get_event_abi_types_for_decoding
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.contract import AsyncContract
+from eth_abi.codec import ABICodec
+from eth_utils import abi_to_signature, event_abi_to_log_topic
 from blockchain.entities import WalletBalanceEntity, ContractEventEntity
+from blockchain.utils import to_checksum_address
 from core.redis.providers import CacheService
 
+
+WEI_PER_ETHER = 10 ** 18
+
+# Тот же строгий кодек, что у AsyncWeb3 по умолчанию; модульный — чтобы работать и в воркерах
+_ABI_CODEC = ABICodec(build_strict_registry())
+
+_SCALAR_TYPES = frozenset({int, float, str, bool, type(None)})
+
+# Поля лога, которые хранятся в кеше чанков (по списку значений на лог, в этом порядке);
+# blockHash и transactionIndex нужны process_log
+_CACHED_LOG_FIELDS = (
+    'address', 'topics', 'data', 'blockNumber',
+    'blockHash', 'transactionHash', 'transactionIndex', 'logIndex'
+)
+
+
+def _serialize_value(value: any) -> any:
+    """
+    Serialize decoded event value for JSON response.
+    
+    Dispatches on the exact type: scalars (the vast majority of event args)
+    cost one set lookup, bytes and containers one dict lookup. Subclasses and
+    exotic types fall back to isinstance checks.
+    
+    Parameters
+    ----------
+    value : any
+        Value to serialize
+        
+    Returns
+    -------
+    any
+        Serialized value
+    """
+    value_type = type(value)
+    if value_type in _SCALAR_TYPES:
+        return value
+    serializer = _SERIALIZERS.get(value_type)
+    if serializer is not None:
+        return serializer(value)
+    if isinstance(value, (int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return value.hex()
+    if isinstance(value, (list, tuple)):
+        return [_serialize_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _serialize_value(v) for k, v in value.items()}
+    return str(value)
+
+
+_SERIALIZERS = {
+    bytes: bytes.hex,
+    HexBytes: bytes.hex,
+    list: lambda value: [_serialize_value(v) for v in value],
+    tuple: lambda value: [_serialize_value(v) for v in value],
+    dict: lambda value: {k: _serialize_value(v) for k, v in value.items()},
+}
+
+
+def _compile_event_abi(event_abi: dict) -> tuple:
+    """
+    Precompute everything needed to decode logs of one event.
+    
+    Mirrors web3's get_event_data, but the ABI walk happens once per event
+    instead of once per log.
+    
+    Parameters
+    ----------
+    event_abi : dict
+        Event ABI entry
+        
+    Returns
+    -------
+    tuple
+        Decoder spec for `_decode_event_args` (plain data, picklable)
+    """
+    topic_inputs = normalize_event_input_types(get_indexed_event_inputs(event_abi))
+    data_inputs = normalize_event_input_types(exclude_indexed_event_inputs(event_abi))
+    topic_types = tuple(get_event_abi_types_for_decoding(topic_inputs))
+    data_types = tuple(get_event_abi_types_for_decoding(data_inputs))
+    topic_names = tuple(item['name'] for item in topic_inputs)
+    data_names = tuple(item['name'] for item in data_inputs)
+    
+    duplicate_names = set(topic_names).intersection(data_names)
+    if duplicate_names:
+        raise ValueError(f"Duplicated argument names between event inputs: {', '.join(duplicate_names)}")
+    
+    # Без структур и массивов адресов аргументы собираются простым zip,
+    # а нормализация сводится к checksum для полей типа address
+    flat = not any('(' in t or t.startswith('address[') for t in topic_types + data_types)
+    address_names = tuple(
+        name for name, t in zip(topic_names + data_names, topic_types + data_types)
+        if t == 'address'
+    )
+    topics_offset = 0 if event_abi.get('anonymous') else 1
+    return (
+        topics_offset, topic_types, topic_names, data_types, data_names,
+        data_inputs, flat, address_names
+    )
+
+
+def _decode_event_args(spec: tuple, topics: list, data: bytes) -> dict:
+    """
+    Decode event arguments from raw topics and data with a precompiled spec.
+    
+    Parameters
+    ----------
+    spec : tuple
+        Decoder spec from `_compile_event_abi`
+    topics : list
+        Raw log topics (bytes)
+    data : bytes
+        Raw log data
+        
+    Returns
+    -------
+    dict
+        Argument name -> value, addresses checksummed
+    """
+    (
+        topics_offset, topic_types, topic_names, data_types, data_names,
+        data_inputs, flat, address_names
+    ) = spec
+    if len(topics) - topics_offset != len(topic_types):
+        raise ValueError(f"Expected {len(topic_types)} log topics. Got {len(topics) - topics_offset}")
+    
+    decode = _ABI_CODEC.decode
+    # Все индексированные значения занимают ровно по слову — декодируем одним вызовом
+    topic_values = decode(topic_types, b''.join(topics[topics_offset:])) if topic_types else ()
+    data_values = decode(data_types, data)
+    
+    if flat:
+        args = dict(zip(topic_names, topic_values))
+        args.update(zip(data_names, data_values))
+        for name in address_names:
+            args[name] = to_checksum_address(args[name])
+        return args
+    
+    args = dict(zip(topic_names, map_abi_data(BASE_RETURN_NORMALIZERS, topic_types, topic_values)))
+    args.update(named_tree(data_inputs, map_abi_data(BASE_RETURN_NORMALIZERS, data_types, data_values)))
+    return args
+
+
+def _decode_log_rows(sig_to_event: dict[bytes, tuple], logs: list) -> tuple[list[tuple], list[str]]:
+    """
+    Decode raw logs into plain rows.
+    
+    Holds no service state and returns only picklable data, so it can run
+    in a worker process.
+    
+    Parameters
+    ----------
+    sig_to_event : dict[bytes, tuple]
+        topic0 -> (decoder spec or None, signature, event name)
+    logs : list
+        Raw logs
+        
+    Returns
+    -------
+    tuple[list[tuple], list[str]]
+        (transaction_hash, block_number, log_index, event_name, args, address)
+        rows and messages about logs that failed to decode
+    """
+    rows = []
+    errors = []
+    # Горячие имена — в локальные переменные
+    append = rows.append
+    get_event = sig_to_event.get
+    scalar_types = _SCALAR_TYPES
+    
+    for log in logs:
+        topics = log['topics']
+        # HexBytes из ноды и bytes из кеша хешируются одинаково. С фильтром по topic0
+        # на стороне ноды промахов почти не бывает: только контракты без событий в ABI
+        hit = get_event(topics[0]) if topics else None
+        
+        # Событие без спеки (ABI не удалось разобрать) отдаём как неизвестное
+        if hit is not None and hit[0] is None:
+            hit = None
+        
+        if hit is not None:
+            spec, signature, event_name = hit
+            try:
+                decoded_args = _decode_event_args(spec, topics, log['data'])
+            except Exception as e:
+                errors.append(f"Failed to decode event {signature}: {e}")
+                hit = None
+            else:
+                # Скаляры отдаём как есть, не тратя вызов функции
+                args = {
+                    k: v if type(v) in scalar_types else _serialize_value(v)
+                    for k, v in decoded_args.items()
+                }
+        
+        if hit is None:
+            event_name = 'UnknownEvent'
+            args = {
+                'topics': [t.hex() for t in topics],
+                'data': log['data'].hex()
+            }
+        
+        append((
+            log['transactionHash'].hex(),
+            log['blockNumber'],
+            log['logIndex'],
+            event_name,
+            args,
+            log['address']
+        ))
+    
+    return rows, errors
+
+
+# Воркер пула декодирования: ключ таблицы событий -> таблица. Таблицы зависят от контракта
+# и в initializer неизвестны, поэтому каждая пересылается в воркер один раз, по первому промаху
+_worker_event_tables: dict[bytes, dict[bytes, tuple]] | None = None
+_WORKER_EVENT_TABLES_MAX = 256
+
+
+class _EventTableMissing(LookupError):
+    """
+    Raised in a decode worker that has not received the event table yet.
+    """
+
+
+def init_decode_worker() -> None:
+    """
+    Initialize a decode pool worker; pass as ProcessPoolExecutor initializer.
+    
+    Sets up the per-worker event table cache used by `_decode_log_rows_in_worker`.
+    """
+    global _worker_event_tables
+    _worker_event_tables = {}
+
+
+def _decode_log_rows_in_worker(
+    table_key: bytes,
+    logs: list,
+    sig_to_event: dict[bytes, tuple] | None = None
+) -> tuple[list[tuple], list[str]]:
+    """
+    Decode raw logs in a pool worker with an event table cached there.
+    
+    Parameters
+    ----------
+    table_key : bytes
+        Event table key, see `Web3Service._get_event_table`
+    logs : list
+        Raw logs
+    sig_to_event : dict[bytes, tuple] | None
+        Event table to cache under table_key, None to use the cached one
+        
+    Returns
+    -------
+    tuple[list[tuple], list[str]]
+        Same as `_decode_log_rows`
+        
+    Raises
+    ------
+    _EventTableMissing
+        If sig_to_event is None and the worker has no table for table_key
+    """
+    tables = _worker_event_tables
+    if tables is None:
+        raise RuntimeError("Decode worker is not initialized, see init_decode_worker")
+    if sig_to_event is None:
+        sig_to_event = tables.get(table_key)
+        if sig_to_event is None:
+            raise _EventTableMissing(table_key)
+    elif table_key not in tables:
+        # Самые старые таблицы вытесняются первыми
+        if len(tables) >= _WORKER_EVENT_TABLES_MAX:
+            tables.pop(next(iter(tables)))
+        tables[table_key] = sig_to_event
+    return _decode_log_rows(sig_to_event, logs)
+
+
 class Web3Service:
     """
     Service for interacting with blockchain networks.
@@ -17,16 +317,62 @@ class Web3Service:
         Logger instance
     cache_service : CacheService
         Cache service for caching chunk results
+    decode_executor : Executor | None
+        Executor (normally a process pool) for decoding large log chunks;
+        without it all chunks are decoded in the event loop
     """
     
+    # Публичные RPC ограничивают размер JSON-RPC batch; балансы шлём пачками не больше этой
+    BALANCE_BATCH_SIZE = 50
+    # Ограничение одновременных eth_getLogs, чтобы не упираться в лимиты RPC провайдера
+    LOGS_CONCURRENCY = 8
+    LOGS_MAX_RETRIES = 3
+    LOGS_BACKOFF_BASE = 0.5
+    # Фрагменты ошибок, которыми провайдеры отвечают на слишком «тяжёлый» eth_getLogs;
+    # такие диапазоны не ретраим, а делим пополам
+    LOGS_TOO_LARGE_ERRORS = (
+        "query returned more than", "limit exceeded", "query exceeds",
+        "range is too large", "too many", "max results", "limited to",
+        "response size"
+    )
+    # Отказы по ширине диапазона блоков (тоже делим): это лимит ноды, а не плотность логов,
+    # поэтому потолок слияния после них не ослабляется
+    LOGS_RANGE_CAP_ERRORS = (
+        "range is too large", "block range is too", "maximum block range", "block range limit"
+    )
+    # Сколько диапазонов упаковываем в один JSON-RPC batch eth_getLogs
+    LOGS_BATCH_SIZE = 50
+    # Сколько batch-запросов держим в работе одновременно
+    LOGS_BATCHES_IN_FLIGHT = 16
+    
+    # Чанки глубже FINALITY_DEPTH блоков от головы неизменны и кешируются без TTL
+    FINALITY_DEPTH = 128
+    TIP_CHUNK_TTL = 30
+    # Адаптивный размер диапазона eth_getLogs: растёт, пока ответы меньше порога
+    LOGS_SPAN_GROW_BELOW = 1000
+    LOGS_SPAN_HINTS_MAX = 1024
+    # Соседние чанки без известной плотности запрашиваем одним диапазоном до этого размера
+    LOGS_PROBE_BLOCKS = 16000
+    # Чанки меньше этого декодируем прямо в event loop: пересылка в процесс дороже
+    DECODE_OFFLOAD_MIN_LOGS = 2000
+    
     def __init__(
         self, web3_clients: dict[str, AsyncWeb3], 
         logger: logging.Logger,
-        cache_service: CacheService
+        cache_service: CacheService,
+        decode_executor: Executor | None = None
     ):
         self.web3_clients = web3_clients
         self.logger = logger
         self.cache = cache_service
+        self.decode_executor = decode_executor
+        self._logs_semaphore = asyncio.Semaphore(self.LOGS_CONCURRENCY)
+        # contract factory -> (ключ, таблица событий); живёт, пока фабрику держит ABIService
+        self._event_tables: WeakKeyDictionary = WeakKeyDictionary()
+        # key_prefix запроса -> размер диапазона, который нода отдаёт без ошибки
+        self._logs_spans: dict[str, int] = {}
+        # key_prefix запроса -> потолок слияния после отказа ноды по ширине диапазона
+        self._merge_limits: dict[str, int] = {}
     
     def _get_client(self, network: str) -> AsyncWeb3:
         """
@@ -76,27 +422,80 @@ class Web3Service:
         """
         web3 = self._get_client(network)
         
-        checksum_address = web3.to_checksum_address(wallet_address)
-        balance_wei = await web3.eth.get_balance(checksum_address, block_number)
-        balance_eth = web3.from_wei(balance_wei, 'ether')
+        checksum_address = to_checksum_address(wallet_address)
+        balance_wei = int(await web3.eth.get_balance(checksum_address, block_number))
         
-        return WalletBalanceEntity(
+        return WalletBalanceEntity.model_construct(
             wallet_address=wallet_address,
             block_number=block_number,
-            balance_wei=int(balance_wei),
-            balance_eth=float(balance_eth),
+            balance_wei=balance_wei,
+            balance_eth=balance_wei / WEI_PER_ETHER,
             network=network
         )
     
+    async def get_balances_at_blocks(
+        self,
+        queries: list[tuple[str, int]],
+        network: str
+    ) -> list[WalletBalanceEntity]:
+        """
+        Get balances for many (wallet, block) pairs with JSON-RPC batches.
+        
+        Queries are split into batches of BALANCE_BATCH_SIZE, sent concurrently.
+        
+        Parameters
+        ----------
+        queries : list[tuple[str, int]]
+            Wallet address and block number pairs
+        network : str
+            Network name
+            
+        Returns
+        -------
+        list[WalletBalanceEntity]
+            Wallet balance entities in the same order as queries
+        """
+        web3 = self._get_client(network)
+        
+        async def fetch(batch_queries: list[tuple[str, int]]) -> list:
+            async with web3.batch_requests() as batch:
+                for wallet_address, block_number in batch_queries:
+                    batch.add(web3.eth.get_balance(to_checksum_address(wallet_address), block_number))
+                return await batch.async_execute()
+        
+        batch_results = await asyncio.gather(*(
+            fetch(queries[i:i + self.BALANCE_BATCH_SIZE])
+            for i in range(0, len(queries), self.BALANCE_BATCH_SIZE)
+        ))
+        
+        entities = []
+        for (wallet_address, block_number), balance in zip(queries, chain.from_iterable(batch_results)):
+            balance_wei = int(balance)
+            entities.append(WalletBalanceEntity.model_construct(
+                wallet_address=wallet_address,
+                block_number=block_number,
+                balance_wei=balance_wei,
+                balance_eth=balance_wei / WEI_PER_ETHER,
+                network=network
+            ))
+        return entities
+    
     async def get_contract_events(
         self,
         contract_address: str,
         from_block: int,
         network: str,
-        contract_abi: list[dict[str, any]]
-    ) -> list[ContractEventEntity]:
+        contract: type[AsyncContract],
+        to_block: int | None = None,
+        current_block: int | None = None,
+        failed_chunks: list[tuple[int, int]] | None = None
+    ) -> AsyncIterator[ContractEventEntity]:
         """
-        Get all events from contract starting from specified block.
+        Stream all events from contract starting from specified block.
+        
+        Events are yielded in (block_number, log_index) order as soon as all
+        earlier chunks are decoded, so neither the full list nor a final sort
+        is needed.
         
         Parameters
         ----------
@@ -106,224 +505,365 @@ class Web3Service:
             Starting block number
         network : str
             Network name
-        contract_abi : list[dict[str, any]]
-            Contract ABI
+        contract : type[AsyncContract]
+            Contract factory bound to the contract ABI
+        to_block : int | None
+            Last block to include, None for the current chain head
+        current_block : int | None
+            Chain head already known to the caller, None to query the node
+        failed_chunks : list[tuple[int, int]] | None
+            If given, block ranges of chunks that could not be fetched are
+            appended to it; their events are missing from the stream
             
-        Returns
-        -------
-        list[ContractEventEntity]
-            List of contract events
+        Yields
+        ------
+        ContractEventEntity
+            Contract events in chain order
         """
         web3 = self._get_client(network)
         
-        checksum_address = web3.to_checksum_address(contract_address)
-        current_block = await web3.eth.block_number
+        checksum_address = to_checksum_address(contract_address)
+        if current_block is None:
+            current_block = await web3.eth.block_number
+        # Голова цепи остаётся current_block: от неё считается финальность чанков в кеше
+        last_block = current_block if to_block is None else min(to_block, current_block)
         
-        contract = web3.eth.contract(address=checksum_address, abi=contract_abi)
+        contract_abi = contract.abi
         event_abis = [abi for abi in contract_abi if abi.get('type') == 'event']
         
-        topics_filter = None
-        if event_abis:
-            topics_filter = []
-            for event_abi in event_abis:
-                event = getattr(contract.events, event_abi['name'], None)
-                if event and hasattr(event, 'event_signature_hash'):
-                    topics_filter.append(event.event_signature_hash)
-        
-        self.logger.info(f"Contract: {contract_address}, Network: {network}")
-        self.logger.info(f"Total ABI items: {len(contract_abi)}")
-        self.logger.info(f"Event ABIs found: {len(event_abis)}")
-        if event_abis:
-            event_names = [e['name'] for e in event_abis]
-            self.logger.info(f"Event names: {event_names}")
-            for event_abi in event_abis:
-                event = getattr(contract.events, event_abi['name'], None)
-                if event and hasattr(event, 'event_signature_hash'):
-                    self.logger.info(f"Event '{event_abi['name']}' signature hash: {event.event_signature_hash}")
+        table_key, sig_to_event = self._get_event_table(contract)
         
-        chunk_size = 2000
-        total_blocks = current_block - from_block + 1
-        estimated_chunks = total_blocks // chunk_size
-        self.logger.info(f"Fetching logs from block {from_block} to {current_block} (total blocks: {total_blocks:,}, estimated chunks: {estimated_chunks:,})")
+        self.logger.info(
+            f"Contract: {contract_address}, Network: {network}, "
+            f"ABI items: {len(contract_abi)}, events: {[e['name'] for e in event_abis]}"
+        )
+        # Таблицу хешей собираем только если её действительно запишут
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Event signature hashes: " + ", ".join(
+                f"{signature}={signature_hash.hex()}"
+                for signature_hash, (_, signature, _) in sig_to_event.items()
+            ))
         
-        batch_size = 100
-        chunks_results = []
+        # Фильтруем по topic0 на стороне ноды: пустые для наших событий диапазоны
+        # не гоняют по сети чужие логи. Без событий в ABI фильтр не ставим.
+        topics = sorted(f"0x{signature_hash.hex()}" for signature_hash in sig_to_event) or None
+        key_prefix = self._chunk_key_prefix(network, checksum_address, topics)
         
-        # Adaptive chunking: если много пустых чанков подряд — делаем большие прыжки
-        empty_chunks_in_row = 0
-        skip_multiplier = 1
+        chunk_size = 2000
+        # Границы выровнены по chunk_size, чтобы запросы с разным from_block
+        # попадали в одни и те же ключи кеша
+        # Первый чанк добивается до ближайшей границы, остальные идут ровно по chunk_size;
+        # список собирается одним проходом, без промежуточного кортежа стартов
+        aligned_starts = range(from_block - from_block % chunk_size + chunk_size, last_block + 1, chunk_size)
+        chunk_ranges = [
+            (start, min(start - start % chunk_size + chunk_size - 1, last_block))
+            for start in chain((from_block,), aligned_starts)
+            if start <= last_block
+        ]
+        total_blocks = max(last_block - from_block + 1, 0)
+        self.logger.info(f"Fetching logs from block {from_block} to {last_block} (total blocks: {total_blocks:,}, chunks: {len(chunk_ranges):,})")
         
-        current_pos = from_block
-        batch_tasks = []
-        processed_chunks = 0
+        total_logs = 0
+        total_events = 0
+        error_count = 0
         total_chunks_with_logs = 0
         total_empty_chunks = 0
-        batch_number = 0
-        
-        while current_pos <= current_block:
-            if len(batch_tasks) >= batch_size:
-                batch_number += 1
-                blocks_covered = current_pos - from_block
-                progress_pct = (blocks_covered / total_blocks) * 100
-                self.logger.info(f"Processing batch #{batch_number}: {len(batch_tasks)} chunks (progress: {progress_pct:.1f}%, blocks: {blocks_covered:,}/{total_blocks:,})")
-                batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-                
-                # Анализируем результаты для adaptive chunking
-                batch_empty = 0
-                batch_with_logs = 0
-                for result in batch_results:
-                    if isinstance(result, Exception):
-                        continue
-                    if len(result) == 0:
-                        batch_empty += 1
-                    else:
-                        batch_with_logs += 1
-                
-                chunks_results.extend(batch_results)
-                total_chunks_with_logs += batch_with_logs
-                total_empty_chunks += batch_empty
-                
-                success = sum(1 for r in batch_results if not isinstance(r, Exception))
-                errors = len(batch_results) - success
-                self.logger.info(
-                    f"Batch #{batch_number} completed: {success} successful, {errors} errors, "
-                    f"{batch_with_logs} with logs, {batch_empty} empty "
-                    f"(total: {total_chunks_with_logs} with logs, {total_empty_chunks} empty)"
-                )
-                
-                # Adaptive logic: если батч полностью пустой — увеличиваем skip
-                if batch_empty == success and batch_empty > 0:
-                    empty_chunks_in_row += batch_empty
-                    if empty_chunks_in_row >= 50:
-                        skip_multiplier = min(skip_multiplier * 2, 10)
-                        self.logger.info(f"No events in {empty_chunks_in_row} chunks, increasing skip to {skip_multiplier}x")
-                else:
-                    # Нашли события — возвращаем нормальный режим
-                    if skip_multiplier > 1:
-                        self.logger.info(f"Events found, returning to normal chunking")
-                    empty_chunks_in_row = 0
-                    skip_multiplier = 1
-                
-                batch_tasks = []
-            
-            # Создаём задачу для текущего чанка
-            end_block = min(current_pos + chunk_size - 1, current_block)
-            batch_tasks.append(self._fetch_logs_chunk(
-                web3, checksum_address, current_pos, end_block, 
-                network, topics_filter)
-            )
-            
+        processed_chunks = 0
+        # Считаем по фактическим границам чанков: первый чанк короче chunk_size,
+        # поэтому «чанки × chunk_size» завышает прогресс
+        processed_blocks = 0
+        
+        # Сначала приходят чанки из кеша, затем загруженные — по порядку; держим
+        # декодированные, пока не готовы все предыдущие. Логи внутри чанка нода отдаёт уже
+        # отсортированными, а диапазоны чанков не пересекаются — слияние не нужно
+        ready: dict[int, list[ContractEventEntity]] = {}
+        next_index = 0
+        
+        async for (chunk_from, chunk_to), result in self._iter_chunks(
+            web3, checksum_address, chunk_ranges, key_prefix, current_block, topics
+        ):
             processed_chunks += 1
-            # Двигаемся вперёд с учётом skip_multiplier
-            current_pos += chunk_size * skip_multiplier
-        
-        # Обрабатываем последний батч
-        if batch_tasks:
-            batch_number += 1
-            self.logger.info(f"Processing final batch #{batch_number}: {len(batch_tasks)} chunks")
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-            
-            batch_with_logs = sum(1 for r in batch_results if not isinstance(r, Exception) and len(r) > 0)
-            batch_empty = sum(1 for r in batch_results if not isinstance(r, Exception) and len(r) == 0)
+            processed_blocks += chunk_to - chunk_from + 1
+            decoded = []
+            if isinstance(result, Exception):
+                error_count += 1
+                self.logger.warning(f"Chunk {chunk_from}-{chunk_to} failed with error: {result}")
+                if failed_chunks is not None:
+                    failed_chunks.append((chunk_from, chunk_to))
+            elif len(result) == 0:
+                total_empty_chunks += 1
+            else:
+                total_chunks_with_logs += 1
+                total_logs += len(result)
+                decoded = await self._decode_logs(result, table_key, sig_to_event, network)
             
-            chunks_results.extend(batch_results)
-            total_chunks_with_logs += batch_with_logs
-            total_empty_chunks += batch_empty
+            ready[chunk_from] = decoded
+            while next_index < len(chunk_ranges) and chunk_ranges[next_index][0] in ready:
+                chunk_events = ready.pop(chunk_ranges[next_index][0])
+                total_events += len(chunk_events)
+                next_index += 1
+                for event in chunk_events:
+                    yield event
             
-            success = sum(1 for r in batch_results if not isinstance(r, Exception))
-            errors = len(batch_results) - success
-            self.logger.info(
-                f"Final batch #{batch_number} completed: {success} successful, {errors} errors, "
-                f"{batch_with_logs} with logs, {batch_empty} empty"
-            )
+            if processed_chunks % (self.LOGS_BATCH_SIZE * self.LOGS_BATCHES_IN_FLIGHT) == 0:
+                self.logger.info(
+                    f"Progress: {processed_chunks:,}/{len(chunk_ranges):,} chunks, "
+                    f"{processed_blocks:,}/{total_blocks:,} blocks"
+                )
         
         self.logger.info(
-            f"✓ Completed fetching {len(chunks_results)} chunks total: "
+            f"✓ Completed fetching {processed_chunks} chunks total: "
             f"{total_chunks_with_logs} with logs, {total_empty_chunks} empty, "
-            f"{len(chunks_results) - total_chunks_with_logs - total_empty_chunks} errors"
+            f"{error_count} errors; {total_logs} logs, {total_events} events decoded"
         )
+    
+    def _get_event_table(self, contract: type[AsyncContract]) -> tuple[bytes, dict[bytes, tuple]]:
+        """
+        Get topic0 -> (decoder spec, signature, event name) table for contract,
+        built once per contract factory.
         
-        total_logs = 0
-        error_count = 0
-        events = []
-        for logs_chunk in chunks_results:
-            if isinstance(logs_chunk, Exception):
-                error_count += 1
-                self.logger.warning(f"Chunk failed with error: {logs_chunk}")
-                continue
+        Contract factories are memoized by ABIService, so repeated requests for
+        the same contract reuse the computed signatures, topic hashes and
+        decoder specs.
+        
+        Parameters
+        ----------
+        contract : type[AsyncContract]
+            Contract factory bound to the contract ABI
             
-            total_logs += len(logs_chunk)
+        Returns
+        -------
+        tuple[bytes, dict[bytes, tuple]]
+            Table key (digest of the table, identifies it in decode workers) and
+            topic0 (raw bytes) -> (decoder spec, signature, event name)
+        """
+        entry = self._event_tables.get(contract)
+        if entry is None:
+            # HexBytes хешируется как bytes, поэтому в цикле декодирования hex() не нужен
+            table = {}
+            for abi in contract.abi:
+                if abi.get('type') == 'event':
+                    signature = abi_to_signature(abi)
+                    try:
+                        spec = _compile_event_abi(abi)
+                    except Exception as e:
+                        # Логи такого события по-прежнему забираем, но отдаём как UnknownEvent
+                        self.logger.warning(f"Cannot decode event {signature}: {e}")
+                        spec = None
+                    table[event_abi_to_log_topic(abi)] = (spec, signature, abi['name'])
+            # Одинаковые ABI дают одинаковый ключ — воркеры делят таблицу между фабриками
+            entry = (hashlib.blake2b(pickle.dumps(table), digest_size=16).digest(), table)
+            self._event_tables[contract] = entry
+        return entry
+    
+    async def _iter_chunks(
+        self,
+        web3: AsyncWeb3,
+        contract_address: str,
+        chunk_ranges: list[tuple[int, int]],
+        key_prefix: str,
+        current_block: int,
+        topics: list[str] | None
+    ) -> AsyncIterator[tuple[tuple[int, int], list | Exception]]:
+        """
+        Fetch chunks in JSON-RPC batches, keeping up to LOGS_BATCHES_IN_FLIGHT
+        batches in flight at all times.
+        
+        Fetched batches are yielded in block order, and a batch holds its slot
+        until the consumer has taken its results in that order. When decoding
+        falls behind or an early batch is slow, fetching pauses after
+        LOGS_BATCHES_IN_FLIGHT batches instead of piling up raw logs in memory.
+        
+        Cached chunks are read with one MGET and yielded first; only misses go
+        to the node, LOGS_BATCH_SIZE ranges per HTTP request. A failed chunk
+        does not cancel its siblings; its exception is yielded instead of logs.
+        
+        Parameters
+        ----------
+        web3 : AsyncWeb3
+            Web3 client instance
+        contract_address : str
+            Contract address (checksum)
+        chunk_ranges : list[tuple[int, int]]
+            Block ranges to fetch
+        key_prefix : str
+            Chunk cache key prefix, see `_chunk_key_prefix`
+        current_block : int
+            Current chain head
+        topics : list[str] | None
+            topic0 filter passed to every chunk
             
-            for log in logs_chunk:
-                event_name = 'UnknownEvent'
-                decoded_args = {}
-                
-                if log.get('topics'):
-                    # Поддержка как свежих логов (HexBytes), так и из кеша (str)
-                    topic = log['topics'][0]
-                    event_signature_hash = topic.hex() if hasattr(topic, 'hex') else topic
-                    
-                    matched = False
-                    for event_abi in event_abis:
-                        event = getattr(contract.events, event_abi['name'], None)
-                        if event and hasattr(event, 'event_signature_hash'):
-                            if event.event_signature_hash == event_signature_hash:
-                                matched = True
-                                try:
-                                    decoded = event.process_log(log)
-                                    event_name = decoded['event']
-                                    decoded_args = {k: self._serialize_value(v) for k, v in decoded['args'].items()}
-                                except Exception as e:
-                                    self.logger.warning(f"Failed to decode event {event_abi['name']}: {e}")
-                                    decoded_args = {
-                                        'topics': [t.hex() if hasattr(t, 'hex') else t for t in log['topics']],
-                                        'data': log['data'].hex() if hasattr(log['data'], 'hex') else log['data'] if log['data'] else '0x'
-                                    }
-                                break
-                    
-                    if not matched:
-                        self.logger.debug(f"Unknown event signature: {event_signature_hash}")
-                
-                if event_name == 'UnknownEvent':
-                    decoded_args = {
-                        'topics': [t.hex() if hasattr(t, 'hex') else t for t in log['topics']],
-                        'data': log['data'].hex() if hasattr(log['data'], 'hex') else log['data'] if log['data'] else '0x'
-                    }
-                
-                # Поддержка как свежих логов, так и из кеша
-                tx_hash = log['transactionHash']
-                transaction_hash = tx_hash.hex() if hasattr(tx_hash, 'hex') else tx_hash
-                
-                events.append(
-                    ContractEventEntity(
-                        transaction_hash=transaction_hash,
-                        block_number=log['blockNumber'],
-                        log_index=log['logIndex'],
-                        event_name=event_name,
-                        args=decoded_args,
-                        address=log['address'],
-                        network=network
-                    )
+        Yields
+        ------
+        tuple[tuple[int, int], list | Exception]
+            Chunk range and its logs (or the error): cached chunks, then fetched
+            chunks in block order
+        """
+        cached_chunks = [None] * len(chunk_ranges)
+        if self.cache:
+            cached_chunks = await self.cache.get_many_packed(
+                [f"{key_prefix}{chunk_from}:{chunk_to}" for chunk_from, chunk_to in chunk_ranges]
+            )
+        
+        hits = []
+        misses = []
+        for chunk_range, cached in zip(chunk_ranges, cached_chunks):
+            if isinstance(cached, list):
+                hits.append((chunk_range, [dict(zip(_CACHED_LOG_FIELDS, row)) for row in cached]))
+            else:
+                misses.append(chunk_range)
+        self.logger.debug(f"Chunk cache: {len(hits)} hits, {len(misses)} misses")
+        
+        batches = [
+            misses[i:i + self.LOGS_BATCH_SIZE]
+            for i in range(0, len(misses), self.LOGS_BATCH_SIZE)
+        ]
+        in_flight = asyncio.Semaphore(self.LOGS_BATCHES_IN_FLIGHT)
+        loop = asyncio.get_running_loop()
+        # Результат каждого батча — в своей ячейке, забираем их строго по порядку
+        pending = [loop.create_future() for _ in batches]
+        tasks = set()
+        
+        def on_done(index: int, task: asyncio.Task) -> None:
+            tasks.discard(task)
+            if task.cancelled():
+                return
+            error = task.exception()
+            pending[index].set_result([error] * len(batches[index]) if error else task.result())
+        
+        async def dispatch() -> None:
+            for index, batch in enumerate(batches):
+                # Слот берём до создания задачи — в полёте не больше LOGS_BATCHES_IN_FLIGHT батчей
+                await in_flight.acquire()
+                task = asyncio.ensure_future(self._fetch_logs_batch(
+                    web3, contract_address, batch, key_prefix, current_block, topics
+                ))
+                tasks.add(task)
+                task.add_done_callback(partial(on_done, index))
+        
+        dispatcher = asyncio.ensure_future(dispatch())
+        try:
+            for hit in hits:
+                yield hit
+            for batch, results in zip(batches, pending):
+                for chunk_range, result in zip(batch, await results):
+                    yield chunk_range, result
+                # Слот освобождается, только когда потребитель разобрал батч по порядку:
+                # медленный первый батч останавливает загрузку, а не копит готовые за ним
+                in_flight.release()
+        finally:
+            dispatcher.cancel()
+            for task in list(tasks):
+                task.cancel()
+    
+    async def _decode_logs(
+        self,
+        logs_chunk: list,
+        table_key: bytes,
+        sig_to_event: dict[bytes, tuple],
+        network: str
+    ) -> list[ContractEventEntity]:
+        """
+        Decode raw logs of one chunk into event entities.
+        
+        Large chunks are decoded in the decode executor (a process pool) when one
+        is configured, so CPU-bound ABI decoding does not block the event loop
+        and overlaps with fetching of other chunks. Only the raw logs are sent
+        with each chunk; a worker gets the event table once, on its first miss.
+        
+        Parameters
+        ----------
+        logs_chunk : list
+            Raw logs (fresh from the node or read back from the chunk cache)
+        table_key : bytes
+            Event table key, see `_get_event_table`
+        sig_to_event : dict[bytes, tuple]
+            topic0 -> (decoder spec, signature, event name)
+        network : str
+            Network name
+            
+        Returns
+        -------
+        list[ContractEventEntity]
+            Decoded events; logs of unknown events keep raw topics and data
+        """
+        if self.decode_executor is not None and len(logs_chunk) >= self.DECODE_OFFLOAD_MIN_LOGS:
+            loop = asyncio.get_running_loop()
+            try:
+                rows, errors = await loop.run_in_executor(
+                    self.decode_executor, _decode_log_rows_in_worker, table_key, logs_chunk
                 )
+            except _EventTableMissing:
+                rows, errors = await loop.run_in_executor(
+                    self.decode_executor, _decode_log_rows_in_worker, table_key, logs_chunk, sig_to_event
+                )
+        else:
+            rows, errors = _decode_log_rows(sig_to_event, logs_chunk)
         
-        events.sort(key=lambda x: (x.block_number, x.log_index))
+        for error in errors:
+            self.logger.warning(error)
         
-        self.logger.info(f"Fetched {total_logs} logs total, {error_count} chunks failed")
-        self.logger.info(f"Decoded {len(events)} events successfully")
+        # Данные собраны нами же — валидация pydantic здесь не нужна
+        construct = ContractEventEntity.model_construct
+        return [
+            construct(
+                transaction_hash=transaction_hash,
+                block_number=block_number,
+                log_index=log_index,
+                event_name=event_name,
+                args=args,
+                address=address,
+                network=network
+            )
+            for transaction_hash, block_number, log_index, event_name, args, address in rows
+        ]
+    
+    @staticmethod
+    def _chunk_key_prefix(network: str, contract_address: str, topics: list[str] | None) -> str:
+        """
+        Build the chunk cache key prefix shared by all chunks of one query.
         
-        return events
+        Only this constant part is hashed (once per query); per-chunk keys just
+        append the block range.
+        
+        Parameters
+        ----------
+        network : str
+            Network name
+        contract_address : str
+            Contract address (checksum)
+        topics : list[str] | None
+            topic0 filter
+            
+        Returns
+        -------
+        str
+            Key prefix ending with ':'
+        """
+        key_data = f"{network}:{contract_address}:{','.join(topics or ())}"
+        return f"logs_chunk:{hashlib.blake2b(key_data.encode(), digest_size=8).hexdigest()}:"
     
-    async def _fetch_logs_chunk(
+    async def _fetch_logs_batch(
         self,
         web3: AsyncWeb3,
         contract_address: str,
-        from_block: int,
-        to_block: int,
-        network: str,
-        topics_filter: list[str] | None = None
-    ) -> list:
+        chunk_ranges: list[tuple[int, int]],
+        key_prefix: str,
+        current_block: int,
+        topics: list[str] | None
+    ) -> list[list | Exception]:
         """
-        Fetch logs for a specific block range with caching.
+        Fetch logs for several block ranges in one JSON-RPC batch and cache them.
+        
+        Adjacent ranges are merged into calls of up to LOGS_PROBE_BLOCKS blocks
+        while the contract is not known to be dense, so quiet stretches cost
+        one call. If the node rejects the batch, ranges are retried as single
+        calls and split adaptively when they hold too many logs. A rejection
+        for too many results only sets the span hint, which relaxes again once
+        batches come back sparse; a rejection for the block range caps merging
+        for the query for good. Once a contract's chunks are known to be too
+        dense, its ranges skip straight to adaptive fetching.
+        Cache reads happen upfront in `_iter_chunks`.
         
         Parameters
         ----------
@@ -331,89 +871,359 @@ class Web3Service:
             Web3 client instance
         contract_address : str
             Contract address (checksum)
-        from_block : int
-            Starting block number
-        to_block : int
-            Ending block number
-        network : str
-            Network name
-        topics_filter : list[str] | None
-            List of topic hashes to filter
+        chunk_ranges : list[tuple[int, int]]
+            Block ranges to fetch
+        key_prefix : str
+            Chunk cache key prefix, see `_chunk_key_prefix`
+        current_block : int
+            Current chain head, used to decide whether a range is final
+        topics : list[str] | None
+            topic0 values to match (OR), None to fetch all logs of the contract
             
         Returns
         -------
-        list
-            List of log entries
+        list[list | Exception]
+            Logs (or the error) per range, aligned with chunk_ranges
         """
-        cache_key_data = f"{network}:{contract_address}:{from_block}:{to_block}:{topics_filter}"
-        cache_key = f"logs_chunk:{hashlib.md5(cache_key_data.encode()).hexdigest()}"
+        filters = []
+        for from_block, to_block in chunk_ranges:
+            filter_params = {
+                'address': contract_address,
+                'fromBlock': from_block,
+                'toBlock': to_block
+            }
+            if topics:
+                filter_params['topics'] = [topics]
+            filters.append(filter_params)
         
-        if self.cache:
+        span = self._logs_spans.get(key_prefix)
+        if span is not None and any(to_block - from_block + 1 > span for from_block, to_block in chunk_ranges):
+            # Целые чанки этого контракта нода уже отвергала — сразу идём кусками
+            results = await asyncio.gather(
+                *(self._get_logs_adaptive(web3, filter_params, key_prefix) for filter_params in filters),
+                return_exceptions=True
+            )
+        else:
+            merge_limit = self._merge_limits.get(key_prefix, self.LOGS_PROBE_BLOCKS)
+            groups = self._group_ranges(chunk_ranges, min(span or self.LOGS_PROBE_BLOCKS, merge_limit))
             try:
-                cached = await self.cache.get(cache_key)
-                if cached and isinstance(cached, dict) and 'logs' in cached:
-                    self.logger.debug(f"Cache hit for chunk {from_block}-{to_block}")
-                    return cached['logs']
+                if len(groups) < len(filters):
+                    try:
+                        results = await self._get_logs_grouped(web3, filters, groups)
+                    except Exception as e:
+                        if not self._is_too_large_error(e):
+                            raise
+                        # Слитые диапазоны для этого контракта велики — пока идём по чанкам.
+                        # Лимит ноды на ширину диапазона не меняется, поэтому только он ставит
+                        # постоянный потолок слияния; «слишком много логов» снимается ослаблением подсказки
+                        chunk_span = max(to_block - from_block + 1 for from_block, to_block in chunk_ranges)
+                        if self._is_range_cap_error(e):
+                            self._set_hint(self._merge_limits, key_prefix, chunk_span)
+                        self._set_logs_span(key_prefix, chunk_span)
+                        results = await self._get_logs_with_retry(web3, filters)
+                else:
+                    results = await self._get_logs_with_retry(web3, filters)
+                    if span is not None and all(len(logs) < self.LOGS_SPAN_GROW_BELOW for logs in results):
+                        # Чанки снова редкие — постепенно возвращаемся к слиянию диапазонов
+                        self._set_logs_span(key_prefix, span * 2 if span * 2 < self.LOGS_PROBE_BLOCKS else None)
             except Exception as e:
-                self.logger.debug(f"Cache read error: {e}")
+                if len(filters) == 1 and not self._is_too_large_error(e):
+                    results = [e]
+                else:
+                    if len(filters) > 1:
+                        self.logger.warning(
+                            f"Batch eth_getLogs for {len(filters)} chunks failed: {e}, falling back to single calls"
+                        )
+                    results = await asyncio.gather(
+                        *(self._get_logs_adaptive(web3, filter_params, key_prefix) for filter_params in filters),
+                        return_exceptions=True
+                    )
         
-        filter_params = {
-            'address': contract_address,
-            'fromBlock': from_block,
-            'toBlock': to_block
-        }
+        # Ошибки чанков логирует потребитель, здесь только отладочные подробности
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        cache_writes = []
+        for (from_block, to_block), logs in zip(chunk_ranges, results):
+            if isinstance(logs, Exception):
+                continue
+            if logs and debug:
+                self.logger.debug(f"Chunk {from_block}-{to_block}: found {len(logs)} logs")
+            if self.cache:
+                cache_writes.append(self._cache_chunk(
+                    f"{key_prefix}{from_block}:{to_block}", logs, to_block, current_block
+                ))
+        await asyncio.gather(*cache_writes)
         
-        if topics_filter:
-            filter_params['topics'] = [topics_filter]
+        return results
+    
+    @staticmethod
+    def _group_ranges(chunk_ranges: list[tuple[int, int]], max_blocks: int) -> list[list[int]]:
+        """
+        Group adjacent chunk ranges so each group spans at most max_blocks blocks.
         
-        try:
-            logs = await web3.eth.get_logs(filter_params)
+        Parameters
+        ----------
+        chunk_ranges : list[tuple[int, int]]
+            Block ranges in ascending order
+        max_blocks : int
+            Largest block span of one group
             
-            if logs:
-                self.logger.debug(f"Chunk {from_block}-{to_block}: found {len(logs)} logs")
+        Returns
+        -------
+        list[list[int]]
+            Indices into chunk_ranges, one list per group
+        """
+        groups = []
+        for index, (from_block, to_block) in enumerate(chunk_ranges):
+            if groups:
+                group = groups[-1]
+                if (
+                    from_block == chunk_ranges[group[-1]][1] + 1
+                    and to_block - chunk_ranges[group[0]][0] + 1 <= max_blocks
+                ):
+                    group.append(index)
+                    continue
+            groups.append([index])
+        return groups
+    
+    async def _get_logs_grouped(
+        self,
+        web3: AsyncWeb3,
+        filters: list[dict],
+        groups: list[list[int]]
+    ) -> list[list]:
+        """
+        Fetch each group of adjacent ranges with one eth_getLogs and split logs back per range.
+        
+        Quiet contracts answer a whole group with an empty list, so long runs
+        of empty chunks cost one call instead of one per chunk.
+        
+        Parameters
+        ----------
+        web3 : AsyncWeb3
+            Web3 client instance
+        filters : list[dict]
+            eth_getLogs filters per chunk, in block order
+        groups : list[list[int]]
+            Indices into filters, see `_group_ranges`
             
-            if self.cache and logs:
-                try:
-                    serialized_logs = [
-                        {
-                            'address': log['address'],
-                            'topics': [t.hex() if hasattr(t, 'hex') else t for t in log['topics']],
-                            'data': log['data'].hex() if hasattr(log['data'], 'hex') else log['data'],
-                            'blockNumber': log['blockNumber'],
-                            'transactionHash': log['transactionHash'].hex() if hasattr(log['transactionHash'], 'hex') else log['transactionHash'],
-                            'logIndex': log['logIndex']
-                        }
-                        for log in logs
-                    ]
-                    await self.cache.set(cache_key, {'logs': serialized_logs}, ttl=3600)
-                except Exception as e:
-                    self.logger.debug(f"Cache write error: {e}")
+        Returns
+        -------
+        list[list]
+            Log entries per filter
+        """
+        group_logs = await self._get_logs_with_retry(web3, [
+            {**filters[group[0]], 'toBlock': filters[group[-1]]['toBlock']}
+            for group in groups
+        ])
+        
+        results = [None] * len(filters)
+        for group, logs in zip(groups, group_logs):
+            starts = [filters[index]['fromBlock'] for index in group]
+            per_chunk = [[] for _ in group]
+            for log in logs:
+                per_chunk[bisect_right(starts, log['blockNumber']) - 1].append(log)
+            for index, chunk_logs in zip(group, per_chunk):
+                results[index] = chunk_logs
+        return results
+    
+    async def _get_logs_adaptive(self, web3: AsyncWeb3, filter_params: dict, key_prefix: str) -> list:
+        """
+        Fetch logs for one range in pieces, adapting piece size to log density.
+        
+        The range is walked from its start: a piece the node rejects as too large
+        is halved and retried, a piece with few logs doubles the size of the next
+        one. The smallest size that passed after a rejection is remembered per
+        query (key_prefix) and used as the starting size for later ranges of the same contract; ranges that
+        go through without a rejection relax it again.
+        
+        Parameters
+        ----------
+        web3 : AsyncWeb3
+            Web3 client instance
+        filter_params : dict
+            eth_getLogs filter for the whole range
+        key_prefix : str
+            Chunk cache key prefix, identifies network, contract and topics
             
-            return logs
+        Returns
+        -------
+        list
+            Log entries of the whole range, in block order
+        """
+        from_block, to_block = filter_params['fromBlock'], filter_params['toBlock']
+        range_size = to_block - from_block + 1
+        span = min(self._logs_spans.get(key_prefix, range_size), range_size)
+        
+        logs = []
+        # Наименьший кусок, прошедший после отказа ноды: безопасный размер для плотных участков
+        safe_span = None
+        rejected = False
+        start = from_block
+        while start <= to_block:
+            end = min(start + span - 1, to_block)
+            try:
+                piece = (await self._get_logs_with_retry(
+                    web3, [{**filter_params, 'fromBlock': start, 'toBlock': end}]
+                ))[0]
+            except Exception as e:
+                if start >= end or not self._is_too_large_error(e):
+                    raise
+                rejected = True
+                span = (end - start + 1) // 2
+                self.logger.debug(f"Range {start}-{end} too large ({e}), retrying with {span} blocks")
+                continue
+            logs.extend(piece)
+            start = end + 1
+            if rejected and (safe_span is None or span < safe_span):
+                safe_span = span
+            # Редкие логи — можно брать диапазон крупнее
+            if len(piece) < self.LOGS_SPAN_GROW_BELOW:
+                span *= 2
+        
+        if safe_span is None:
+            # Ни одного отказа — подсказку ослабляем, пока целые чанки снова не пройдут
+            hint = self._logs_spans.get(key_prefix)
+            safe_span = hint * 2 if hint else None
+        self._set_logs_span(key_prefix, safe_span if safe_span and safe_span < range_size else None)
+        return logs
+    
+    def _set_logs_span(self, key_prefix: str, span: int | None) -> None:
+        """
+        Remember (or forget) the eth_getLogs range size that works for a query.
+        
+        Parameters
+        ----------
+        key_prefix : str
+            Chunk cache key prefix, identifies network, contract and topics
+        span : int | None
+            Range size in blocks, None when nothing is known (adjacent chunks
+            may be merged)
+        """
+        self._set_hint(self._logs_spans, key_prefix, span)
+    
+    def _set_hint(self, hints: dict[str, int], key_prefix: str, value: int | None) -> None:
+        """
+        Store (or drop) a per-query hint, keeping at most LOGS_SPAN_HINTS_MAX of them.
+        
+        Parameters
+        ----------
+        hints : dict[str, int]
+            Hint storage, oldest first
+        key_prefix : str
+            Chunk cache key prefix, identifies network, contract and topics
+        value : int | None
+            Hint value, None to forget it
+        """
+        hints.pop(key_prefix, None)
+        if value is None:
+            return
+        # Самые старые подсказки вытесняются первыми
+        if len(hints) >= self.LOGS_SPAN_HINTS_MAX:
+            hints.pop(next(iter(hints)))
+        hints[key_prefix] = value
+    
+    def _is_too_large_error(self, error: Exception) -> bool:
+        """
+        Check whether eth_getLogs failed because the range holds too many logs.
+        
+        Parameters
+        ----------
+        error : Exception
+            Error raised by the node call
+            
+        Returns
+        -------
+        bool
+            True if the range should be split instead of retried
+        """
+        message = str(error).lower()
+        return any(
+            fragment in message for fragment in self.LOGS_TOO_LARGE_ERRORS + self.LOGS_RANGE_CAP_ERRORS
+        )
+    
+    def _is_range_cap_error(self, error: Exception) -> bool:
+        """
+        Check whether eth_getLogs failed because the node caps the block range.
+        
+        Parameters
+        ----------
+        error : Exception
+            Error raised by the node call
+            
+        Returns
+        -------
+        bool
+            True if the rejection depends on the range width, not on log density
+        """
+        message = str(error).lower()
+        return any(fragment in message for fragment in self.LOGS_RANGE_CAP_ERRORS)
+    
+    async def _cache_chunk(self, cache_key: str, logs: list, to_block: int, current_block: int) -> None:
+        """
+        Store fetched chunk logs in cache.
+        
+        Finalized ranges are cached without expiry (including empty ones),
+        ranges near the chain head only for a short time.
+        
+        Parameters
+        ----------
+        cache_key : str
+            Chunk cache key
+        logs : list
+            Raw logs of the chunk
+        to_block : int
+            Ending block number of the chunk
+        current_block : int
+            Current chain head
+        """
+        try:
+            # Сырые bytes (HexBytes — подкласс bytes) уходят в msgpack как есть, без hex()
+            packed_logs = [
+                [log[field] for field in _CACHED_LOG_FIELDS]
+                for log in logs
+            ]
+            is_final = to_block <= current_block - self.FINALITY_DEPTH
+            await self.cache.set_packed(
+                cache_key,
+                packed_logs,
+                ttl=None if is_final else self.TIP_CHUNK_TTL
+            )
         except Exception as e:
-            self.logger.warning(f"Error fetching logs for chunk {from_block}-{to_block}: {e}")
-            raise
+            self.logger.debug(f"Cache write error: {e}")
     
-    def _serialize_value(self, value: any) -> any:
+    async def _get_logs_with_retry(self, web3: AsyncWeb3, filters: list[dict]) -> list[list]:
         """
-        Serialize value for JSON response.
+        Call eth_getLogs under the concurrency limit, retrying with exponential backoff.
+        
+        Several filters are sent as one JSON-RPC batch (one HTTP request).
         
         Parameters
         ----------
-        value : any
-            Value to serialize
+        web3 : AsyncWeb3
+            Web3 client instance
+        filters : list[dict]
+            eth_getLogs filters
             
         Returns
         -------
-        any
-            Serialized value
-        """
-        if isinstance(value, bytes):
-            return value.hex()
-        elif isinstance(value, (list, tuple)):
-            return [self._serialize_value(v) for v in value]
-        elif isinstance(value, dict):
-            return {k: self._serialize_value(v) for k, v in value.items()}
-        else:
-            return str(value) if not isinstance(value, (int, float, str, bool, type(None))) else value
-
+        list[list]
+            Log entries per filter
+        """
+        for attempt in range(self.LOGS_MAX_RETRIES + 1):
+            try:
+                async with self._logs_semaphore:
+                    if len(filters) == 1:
+                        return [await web3.eth.get_logs(filters[0])]
+                    async with web3.batch_requests() as batch:
+                        for filter_params in filters:
+                            batch.add(web3.eth.get_logs(filter_params))
+                        return await batch.async_execute()
+            except Exception as e:
+                if attempt == self.LOGS_MAX_RETRIES or self._is_too_large_error(e):
+                    raise
+                delay = self.LOGS_BACKOFF_BASE * 2 ** attempt
+                self.logger.debug(
+                    f"get_logs {filters[0]['fromBlock']}-{filters[-1]['toBlock']} failed: {e}, "
+                    f"retrying in {delay}s"
+                )
+                await asyncio.sleep(delay)
@@ -1,10 +1,24 @@
+import asyncio
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_json
+from web3.contract import AsyncContract
 from blockchain.services import Web3Service
 from blockchain.abi_service import ABIService
-from blockchain.schemas import BalanceResponse, EventsResponse, EventResponse
+from blockchain.schemas import (
+    BalanceResponse,
+    BatchBalanceResponse,
+    EventsResponse,
+    EventResponse,
+    GetBalanceRequest
+)
 from core.redis.providers import CacheService
 from core.environment.config import Settings
 
 
+# Кеш событий пишется и читается pydantic-core целиком, без промежуточных dict
+_EVENTS_ADAPTER = TypeAdapter(list[EventResponse])
+
+
 class GetWalletBalanceUseCase:
     """
     Use case for getting wallet balance at specific block.
@@ -47,8 +61,9 @@ class GetWalletBalanceUseCase:
         cache_key = f"balance:{network}:{wallet_address}:{block_number}"
         
         cached = await self.cache.get(cache_key)
+        # Кеш и сущности сервиса заполняем мы сами, повторная валидация не нужна
         if cached:
-            return BalanceResponse(**cached)
+            return BalanceResponse.model_construct(**cached)
         
         balance_entity = await self.web3_service.get_balance_at_block(
             wallet_address=wallet_address,
@@ -56,7 +71,7 @@ class GetWalletBalanceUseCase:
             network=network
         )
         
-        response = BalanceResponse(
+        response = BalanceResponse.model_construct(
             wallet_address=balance_entity.wallet_address,
             block_number=balance_entity.block_number,
             balance_wei=balance_entity.balance_wei,
@@ -69,6 +84,80 @@ class GetWalletBalanceUseCase:
         return response
 
 
+class GetWalletBalancesUseCase:
+    """
+    Use case for getting many wallet balances with one RPC batch per network.
+    
+    Parameters
+    ----------
+    web3_service : Web3Service
+        Web3 service instance
+    cache_service : CacheService
+        Cache service instance
+    """
+    
+    def __init__(self, web3_service: Web3Service, cache_service: CacheService):
+        self.web3_service = web3_service
+        self.cache = cache_service
+    
+    async def __call__(self, items: list[GetBalanceRequest]) -> BatchBalanceResponse:
+        """
+        Execute use case.
+        
+        Parameters
+        ----------
+        items : list[GetBalanceRequest]
+            Balance queries
+            
+        Returns
+        -------
+        BatchBalanceResponse
+            Balances in the same order as items
+        """
+        cache_keys = [
+            f"balance:{item.network}:{item.wallet_address}:{item.block_number}"
+            for item in items
+        ]
+        # Чтение и запись кеша — по одному round trip на весь батч
+        cached = await self.cache.get_many(cache_keys)
+        
+        balances: list[BalanceResponse | None] = [
+            BalanceResponse.model_construct(**value) if value else None for value in cached
+        ]
+        
+        # Промахи группируем по сети: один batch-запрос на ноду
+        misses: dict[str, list[int]] = {}
+        for index, balance in enumerate(balances):
+            if balance is None:
+                misses.setdefault(items[index].network, []).append(index)
+        
+        entities_by_network = await asyncio.gather(*(
+            self.web3_service.get_balances_at_blocks(
+                queries=[
+                    (items[index].wallet_address, items[index].block_number)
+                    for index in indices
+                ],
+                network=network
+            )
+            for network, indices in misses.items()
+        ))
+        
+        fresh = {}
+        for indices, entities in zip(misses.values(), entities_by_network):
+            for index, entity in zip(indices, entities):
+                balances[index] = BalanceResponse.model_construct(
+                    wallet_address=entity.wallet_address,
+                    block_number=entity.block_number,
+                    balance_wei=entity.balance_wei,
+                    balance_eth=entity.balance_eth,
+                    network=entity.network
+                )
+                fresh[cache_keys[index]] = balances[index].model_dump()
+        await self.cache.set_many(fresh, ttl=86400)
+        
+        return BatchBalanceResponse.model_construct(balances=balances)
+
+
 class GetContractEventsUseCase:
     """
     Use case for getting contract events.
@@ -85,6 +174,10 @@ class GetContractEventsUseCase:
         Application settings
     """
     
+    # Граница кешируемой истории событий; совпадает с размером чанка логов
+    EVENTS_HISTORY_WINDOW = 2000
+    EVENTS_HISTORY_TTL = 86400
+    
     def __init__(
         self,
         web3_service: Web3Service,
@@ -125,33 +218,37 @@ class GetContractEventsUseCase:
         
         cache_key = f"events:{network}:{contract_address}:{from_block}:{current_block}"
         
-        cached = await self.cache.get(cache_key)
+        cached = await self.cache.get_raw(cache_key)
         if cached:
-            return EventsResponse(**cached)
+            try:
+                return EventsResponse.model_validate_json(cached)
+            except ValidationError:
+                # Запись в прежнем формате — считаем промахом
+                pass
         
         api_key = self.settings.snowtrace_api_key if network == "avalanche" else self.settings.etherscan_api_key
-        abi = await self.abi_service.get_abi(contract_address, network, api_key, web3_client)
-        
-        events = await self.web3_service.get_contract_events(
-            contract_address=contract_address,
-            from_block=from_block,
-            network=network,
-            contract_abi=abi
+        contract = await self.abi_service.get_contract(
+            web3_client, contract_address, network, api_key
         )
         
-        event_responses = [
-            EventResponse(
-                transaction_hash=event.transaction_hash,
-                block_number=event.block_number,
-                log_index=event.log_index,
-                event_name=event.event_name,
-                args=event.args,
-                address=event.address
+        # Историю до границы EVENTS_HISTORY_WINDOW, ушедшую за финальность, кешируем
+        # отдельно: её ключ не меняется с каждым новым блоком
+        history_to = current_block - Web3Service.FINALITY_DEPTH
+        history_to -= (history_to + 1) % self.EVENTS_HISTORY_WINDOW
+        
+        event_responses = []
+        failed_chunks = []
+        tail_from = from_block
+        if history_to >= from_block:
+            event_responses = await self._get_history_events(
+                contract, contract_address, from_block, history_to, current_block, network, failed_chunks
             )
-            for event in events
-        ]
+            tail_from = history_to + 1
+        event_responses += await self._collect_events(
+            contract, contract_address, tail_from, current_block, current_block, network, failed_chunks
+        )
         
-        response = EventsResponse(
+        response = EventsResponse.model_construct(
             contract_address=contract_address,
             from_block=from_block,
             to_block=current_block,
@@ -160,7 +257,119 @@ class GetContractEventsUseCase:
             total_events=len(event_responses)
         )
         
-        await self.cache.set(cache_key, response.model_dump(), ttl=300)
+        # Неполный ответ (часть чанков не загрузилась) не кешируем: следующий запрос догрузит
+        if not failed_chunks:
+            await self.cache.set_raw(cache_key, to_json(response), ttl=300)
         
         return response
+    
+    async def _get_history_events(
+        self,
+        contract: type[AsyncContract],
+        contract_address: str,
+        from_block: int,
+        to_block: int,
+        current_block: int,
+        network: str,
+        failed_chunks: list[tuple[int, int]]
+    ) -> list[EventResponse]:
+        """
+        Get events of a finalized block range, from cache when possible.
+        
+        The range is cached only if every chunk was fetched.
+        
+        Parameters
+        ----------
+        contract : type[AsyncContract]
+            Contract factory bound to the contract ABI
+        contract_address : str
+            Contract address
+        from_block : int
+            Starting block number
+        to_block : int
+            Last block of the range, must be final
+        current_block : int
+            Current chain head
+        network : str
+            Network name
+        failed_chunks : list[tuple[int, int]]
+            Block ranges of chunks that could not be fetched are appended to it
+            
+        Returns
+        -------
+        list[EventResponse]
+            Events in chain order
+        """
+        cache_key = f"events_history:{network}:{contract_address}:{from_block}:{to_block}"
+        
+        cached = await self.cache.get_raw(cache_key)
+        if cached:
+            try:
+                return _EVENTS_ADAPTER.validate_json(cached)
+            except ValidationError:
+                pass
+        
+        failed_before = len(failed_chunks)
+        events = await self._collect_events(
+            contract, contract_address, from_block, to_block, current_block, network, failed_chunks
+        )
+        if len(failed_chunks) == failed_before:
+            await self.cache.set_raw(cache_key, _EVENTS_ADAPTER.dump_json(events), ttl=self.EVENTS_HISTORY_TTL)
+        return events
+    
+    async def _collect_events(
+        self,
+        contract: type[AsyncContract],
+        contract_address: str,
+        from_block: int,
+        to_block: int,
+        current_block: int,
+        network: str,
+        failed_chunks: list[tuple[int, int]]
+    ) -> list[EventResponse]:
+        """
+        Fetch events of a block range from the node (through the chunk cache).
+        
+        Parameters
+        ----------
+        contract : type[AsyncContract]
+            Contract factory bound to the contract ABI
+        contract_address : str
+            Contract address
+        from_block : int
+            Starting block number
+        to_block : int
+            Last block of the range
+        current_block : int
+            Current chain head
+        network : str
+            Network name
+        failed_chunks : list[tuple[int, int]]
+            Block ranges of chunks that could not be fetched are appended to it
+            
+        Returns
+        -------
+        list[EventResponse]
+            Events in chain order
+        """
+        # Сущности собирает наш сервис, повторная валидация не нужна — только сборка
+        return [
+            EventResponse.model_construct(
+                transaction_hash=event.transaction_hash,
+                block_number=event.block_number,
+                log_index=event.log_index,
+                event_name=event.event_name,
+                args=event.args,
+                address=event.address
+            )
+            async for event in self.web3_service.get_contract_events(
+                contract_address=contract_address,
+                from_block=from_block,
+                network=network,
+                contract=contract,
+                to_block=to_block,
+                current_block=current_block,
+                failed_chunks=failed_chunks
+            )
+        ]
 
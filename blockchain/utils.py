@@ -0,0 +1,20 @@
+from functools import lru_cache
+from web3 import Web3
+
+
+@lru_cache(maxsize=65536)
+def to_checksum_address(address: str) -> str:
+    """
+    Convert address to EIP-55 checksum form, memoized.
+    
+    Parameters
+    ----------
+    address : str
+        Address in any case
+        
+    Returns
+    -------
+    str
+        Checksum address
+    """
+    return Web3.to_checksum_address(address)
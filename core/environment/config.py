@@ -18,6 +18,12 @@ class Settings(BaseSettings):
         Redis database number
     redis_password : str
         Redis password (optional)
+    redis_unix_socket_path : str | None
+        Unix socket of a colocated Redis; used instead of host/port when set
+    redis_max_connections : int
+        Size of the Redis connection pool
+    decode_workers : int
+        Number of worker processes for decoding large event log chunks
     snowtrace_api_key : str
         Snowtrace API key for fetching ABIs (optional)
     etherscan_api_key : str
@@ -32,6 +38,10 @@ class Settings(BaseSettings):
     redis_port: int
     redis_db: int
     redis_password: str
+    redis_unix_socket_path: str | None = None
+    redis_max_connections: int = 64
+    
+    decode_workers: int = 2
     
     snowtrace_api_key: str
     etherscan_api_key: str
@@ -1,5 +1,8 @@
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterable
 from dishka import Provider, provide, Scope
 
 
@@ -8,26 +11,39 @@ class LoggerProvider(Provider):
     Provider for logging configuration and logger instances.
     
     Configures logging to output to console (stdout) with INFO level.
+    Records are handed to a background thread through a queue, so writing
+    to the console never blocks the event loop.
     """
     component = "logger"
     @provide(scope=Scope.APP)
-    def get_logger(self) -> logging.Logger:
+    def get_logger(self) -> Iterable[logging.Logger]:
         """
         Provide configured logger instance.
         
-        Returns
-        -------
+        Yields
+        ------
         logging.Logger
             Configured logger that writes to console
         """
-        if not logging.getLogger().handlers:
-            logging.basicConfig(
-                level=logging.INFO,
-                format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                handlers=[
-                    logging.StreamHandler(sys.stdout)
-                ]
+        listener = None
+        root = logging.getLogger()
+        if not root.handlers:
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(
+                logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
             )
+            log_queue = queue.SimpleQueue()
+            listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+            root.addHandler(QueueHandler(log_queue))
+            root.setLevel(logging.INFO)
+            listener.start()
         
-        return logging.getLogger("blockchain_api")
-
+        try:
+            yield logging.getLogger("blockchain_api")
+        finally:
+            if listener is not None:
+                # Дописываем очередь до конца и возвращаем root в исходное состояние
+                listener.stop()
+                for handler in root.handlers[:]:
+                    if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+                        root.removeHandler(handler)
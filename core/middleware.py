@@ -0,0 +1,68 @@
+import hashlib
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class StaticJSONMiddleware:
+    """
+    ASGI middleware answering GET and HEAD requests for fixed paths with pre-serialized JSON.
+    
+    Such requests never reach FastAPI routing, dependency injection or
+    response serialization. Each body carries a weak ETag, and a matching
+    If-None-Match is answered with 304 and no body.
+    
+    Parameters
+    ----------
+    app : ASGIApp
+        Wrapped application
+    bodies : dict[str, bytes]
+        Path -> JSON body
+    """
+    
+    def __init__(self, app: ASGIApp, bodies: dict[str, bytes]):
+        self.app = app
+        self.responses = {}
+        for path, body in bodies.items():
+            opaque_tag = f'"{hashlib.md5(body).hexdigest()}"'.encode()
+            etag = b"W/" + opaque_tag
+            self.responses[path] = (
+                opaque_tag,
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"etag", etag)
+                    ]
+                },
+                {"type": "http.response.body", "body": body},
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(b"etag", etag)]
+                }
+            )
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            response = self.responses.get(scope["path"])
+            if response is not None:
+                opaque_tag, start, body, not_modified = response
+                
+                # Пробы балансировщика присылают тот же ETag — отвечаем без тела.
+                # If-None-Match сравнивается слабо (RFC 9110): префикс W/ не учитывается
+                for name, value in scope["headers"]:
+                    if name == b"if-none-match":
+                        for tag in value.split(b","):
+                            tag = tag.strip()
+                            if tag == b"*" or tag.removeprefix(b"W/") == opaque_tag:
+                                await send(not_modified)
+                                await send({"type": "http.response.body"})
+                                return
+                        break
+                
+                await send(start)
+                await send(body if scope["method"] == "GET" else {"type": "http.response.body"})
+                return
+        await self.app(scope, receive, send)
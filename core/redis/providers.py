@@ -1,8 +1,11 @@
 from dishka import Provider, Scope, provide, FromComponent
 from typing import Annotated, AsyncIterable
 from core.environment.config import Settings
-from redis.asyncio import Redis
-import json
+from redis.asyncio import BlockingConnectionPool, Redis, UnixDomainSocketConnection
+import msgpack
+# Кодек pydantic-core пишет и читает целые любой ширины (uint256, балансы в wei)
+# за один проход и всегда отдаёт bytes — без запасного пути через stdlib json
+from pydantic_core import from_json, to_json
 
 
 class RedisProvider(Provider):
@@ -21,6 +24,10 @@ class RedisProvider(Provider):
         """
         Create Redis client for the application.
         
+        The client owns a blocking connection pool (TCP or unix socket), so
+        concurrent cache operations use separate connections up to
+        `redis_max_connections`.
+        
         Parameters
         ----------
         settings : Settings
@@ -31,15 +38,28 @@ class RedisProvider(Provider):
         Redis
             Redis client instance
         """
-        redis_client = Redis(
-            host=settings.redis_host,
-            port=settings.redis_port,
+        connection_kwargs = dict(
             db=settings.redis_db,
             password=settings.redis_password if settings.redis_password else None,
-            decode_responses=True,
+            # Значения храним байтами: JSON и msgpack-пакеты декодируются сами
+            decode_responses=False,
             socket_connect_timeout=5,
             socket_timeout=5,
         )
+        if settings.redis_unix_socket_path:
+            # Redis на той же машине — без TCP-стека
+            connection_kwargs.update(
+                connection_class=UnixDomainSocketConnection,
+                path=settings.redis_unix_socket_path
+            )
+        else:
+            connection_kwargs.update(host=settings.redis_host, port=settings.redis_port)
+        # При исчерпании пула запросы ждут свободное соединение, а не открывают новые
+        pool = BlockingConnectionPool(
+            max_connections=settings.redis_max_connections,
+            **connection_kwargs
+        )
+        redis_client = Redis.from_pool(pool)
         
         try:
             await redis_client.ping()
@@ -80,12 +100,144 @@ class CacheService:
         try:
             value = await self.redis.get(key)
             if value:
-                return json.loads(value)
+                return from_json(value)
         except Exception:
             pass
         return None
     
-    async def set(self, key: str, value: dict, ttl: int = 3600) -> bool:
+    async def get_raw(self, key: str) -> bytes | None:
+        """
+        Get cached payload as stored, without decoding.
+        
+        Parameters
+        ----------
+        key : str
+            Cache key
+            
+        Returns
+        -------
+        bytes | None
+            Cached payload or None
+        """
+        try:
+            return await self.redis.get(key)
+        except Exception:
+            return None
+    
+    async def get_many(self, keys: list[str]) -> list:
+        """
+        Get several cached values with a single MGET round trip.
+        
+        Parameters
+        ----------
+        keys : list[str]
+            Cache keys
+            
+        Returns
+        -------
+        list
+            Cached values aligned with keys, None for misses
+        """
+        if not keys:
+            return []
+        try:
+            values = await self.redis.mget(keys)
+        except Exception:
+            return [None] * len(keys)
+        
+        result = []
+        for value in values:
+            try:
+                result.append(from_json(value) if value else None)
+            except Exception:
+                result.append(None)
+        return result
+    
+    async def get_many_packed(self, keys: list[str]) -> list:
+        """
+        Get several msgpack-encoded values with a single MGET round trip.
+        
+        Parameters
+        ----------
+        keys : list[str]
+            Cache keys
+            
+        Returns
+        -------
+        list
+            Unpacked values aligned with keys, None for misses
+        """
+        if not keys:
+            return []
+        try:
+            values = await self.redis.mget(keys)
+        except Exception:
+            return [None] * len(keys)
+        
+        result = []
+        for value in values:
+            try:
+                result.append(msgpack.unpackb(value, raw=False) if value is not None else None)
+            except Exception:
+                result.append(None)
+        return result
+    
+    async def set_packed(self, key: str, value, ttl: int | None = 3600) -> bool:
+        """
+        Set value encoded with msgpack (binary-safe, no hex/JSON round trip).
+        
+        Parameters
+        ----------
+        key : str
+            Cache key
+        value : any
+            msgpack-serializable value (bytes are stored as-is)
+        ttl : int | None
+            Time to live in seconds, None to store without expiry
+            
+        Returns
+        -------
+        bool
+            Success status
+        """
+        try:
+            payload = msgpack.packb(value, use_bin_type=True)
+            if ttl is None:
+                await self.redis.set(key, payload)
+            else:
+                await self.redis.setex(key, ttl, payload)
+            return True
+        except Exception:
+            return False
+    
+    async def set_raw(self, key: str, payload: bytes, ttl: int | None = 3600) -> bool:
+        """
+        Set already serialized payload.
+        
+        Parameters
+        ----------
+        key : str
+            Cache key
+        payload : bytes
+            Serialized value
+        ttl : int | None
+            Time to live in seconds, None to store without expiry
+            
+        Returns
+        -------
+        bool
+            Success status
+        """
+        try:
+            if ttl is None:
+                await self.redis.set(key, payload)
+            else:
+                await self.redis.setex(key, ttl, payload)
+            return True
+        except Exception:
+            return False
+    
+    async def set(self, key: str, value: dict, ttl: int | None = 3600) -> bool:
         """
         Set cached value.
         
@@ -95,8 +247,8 @@ class CacheService:
             Cache key
         value : dict
             Value to cache
-        ttl : int
-            Time to live in seconds
+        ttl : int | None
+            Time to live in seconds, None to store without expiry
             
         Returns
         -------
@@ -104,11 +256,45 @@ class CacheService:
             Success status
         """
         try:
-            await self.redis.setex(
-                key,
-                ttl,
-                json.dumps(value)
-            )
+            if ttl is None:
+                await self.redis.set(key, to_json(value))
+            else:
+                await self.redis.setex(
+                    key,
+                    ttl,
+                    to_json(value)
+                )
+            return True
+        except Exception:
+            return False
+    
+    async def set_many(self, values: dict[str, dict], ttl: int | None = 3600) -> bool:
+        """
+        Set several cached values in one pipelined round trip.
+        
+        Parameters
+        ----------
+        values : dict[str, dict]
+            Cache key -> value to cache
+        ttl : int | None
+            Time to live in seconds, None to store without expiry
+            
+        Returns
+        -------
+        bool
+            Success status
+        """
+        if not values:
+            return True
+        try:
+            # Без MULTI/EXEC: атомарность не нужна, нужен один round trip
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    if ttl is None:
+                        pipe.set(key, to_json(value))
+                    else:
+                        pipe.setex(key, ttl, to_json(value))
+                await pipe.execute()
             return True
         except Exception:
             return False
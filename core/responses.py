@@ -0,0 +1,67 @@
+import json
+from typing import Any
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class JSONResponse(ORJSONResponse):
+    """
+    JSON response rendered with orjson.
+    
+    orjson rejects integers wider than 64 bits. Endpoints whose payloads
+    carry them (uint256 event args, balances in wei) answer with
+    ModelJSONResponse instead; the stdlib fallback here only covers rare
+    cases such as a validation error echoing a huge input number.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        """
+        Serialize response content.
+        
+        Parameters
+        ----------
+        content : Any
+            Response content
+            
+        Returns
+        -------
+        bytes
+            JSON body
+        """
+        try:
+            return super().render(content)
+        except TypeError:
+            return json.dumps(
+                content,
+                ensure_ascii=False,
+                allow_nan=False,
+                separators=(",", ":")
+            ).encode("utf-8")
+
+
+class ModelJSONResponse(Response):
+    """
+    JSON response rendered straight from a pydantic model by pydantic-core.
+    
+    One pass from model to bytes: no intermediate dict, and integers of any
+    width are written natively, so there is no failing first attempt.
+    """
+    
+    media_type = "application/json"
+    
+    def render(self, content: BaseModel) -> bytes:
+        """
+        Serialize response model.
+        
+        Parameters
+        ----------
+        content : BaseModel
+            Response model
+            
+        Returns
+        -------
+        bytes
+            JSON body
+        """
+        return to_json(content)
@@ -1,7 +1,13 @@
+import asyncio
+import logging
+import orjson
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
+from fastapi.openapi.utils import get_openapi
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from dishka.integrations.fastapi import setup_dishka
+from web3 import AsyncWeb3
 
 from core.container import container
 from core.exception_handler import (
@@ -11,12 +17,45 @@ from core.exception_handler import (
     custom_exception_handler
 )
 from core.exceptions import BaseCustomException
+from core.middleware import StaticJSONMiddleware
+from core.responses import JSONResponse
 from blockchain.router import router as blockchain_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: warms up RPC connections on startup and closes
+    container resources (HTTP sessions, Redis) on shutdown.
+    
+    Parameters
+    ----------
+    app : FastAPI
+        FastAPI application
+    """
+    # Ресурсы контейнера закрываем и при сбое старта, и при отменённом shutdown
+    try:
+        logger = await container.get(logging.Logger, component="logger")
+        web3_clients = await container.get(dict[str, AsyncWeb3], component="blockchain")
+        # Один дешёвый запрос на сеть, чтобы TLS-хендшейк не достался первому пользователю
+        results = await asyncio.gather(
+            *(client.eth.chain_id for client in web3_clients.values()),
+            return_exceptions=True
+        )
+        for network, result in zip(web3_clients, results):
+            if isinstance(result, Exception):
+                logger.warning("RPC warm-up failed for %s: %s", network, result)
+        yield
+    finally:
+        await container.close()
+
+
 app = FastAPI(
     title="Blockchain API Service",
     version="1.3.3.7",
     description="Test task for backend developer",
+    lifespan=lifespan,
+    default_response_class=JSONResponse,
 )
 
 setup_dishka(container, app)
@@ -30,37 +69,58 @@ app.add_exception_handler(Exception, custom_exception_handler)
 app.include_router(blockchain_router)
 
 
-@app.get("/")
-async def root():
-    """
-    Root endpoint.
-    
-    Returns
-    -------
-    dict
-        Application information
-    """
-    return {
+# Тела статичны — сериализуем один раз при импорте; путь -> (описание для OpenAPI, тело)
+_STATIC_ROUTES = {
+    "/": ("Root endpoint", orjson.dumps({
         "name": "Blockchain API Service",
         "version": "1.3.3.7",
         "description": "Test task for backend developer",
         "endpoints": {
             "balance": "/api/blockchain/balance",
+            "balance_batch": "/api/blockchain/balance/batch",
             "events": "/api/blockchain/events",
             "docs": "/docs"
         }
-    }
+    })),
+    "/health": ("Basic (or based xD) health check endpoint", orjson.dumps({
+        "status": "healthy but depressed",
+        "version": "1.3.3.7"
+    }))
+}
+
+# Пробы балансировщика отвечаем до роутинга FastAPI; своих маршрутов у этих путей нет
+app.add_middleware(
+    StaticJSONMiddleware,
+    bodies={path: body for path, (_, body) in _STATIC_ROUTES.items()}
+)
 
 
-@app.get("/health")
-async def health():
+def openapi() -> dict:
     """
-    Basic (or based xD) health check endpoint.
+    Build OpenAPI schema including the paths answered by StaticJSONMiddleware.
     
     Returns
     -------
     dict
-        Health status
+        OpenAPI schema, generated once and cached on the app
     """
-    return {"status": "healthy but depressed", "version": "1.3.3.7"}
+    if app.openapi_schema is None:
+        schema = get_openapi(
+            title=app.title,
+            version=app.version,
+            description=app.description,
+            routes=app.routes
+        )
+        for path, (summary, body) in _STATIC_ROUTES.items():
+            schema["paths"][path] = {"get": {
+                "summary": summary,
+                "responses": {"200": {
+                    "description": "Successful Response",
+                    "content": {"application/json": {"example": orjson.loads(body)}}
+                }}
+            }}
+        app.openapi_schema = schema
+    return app.openapi_schema
+
 
+app.openapi = openapi
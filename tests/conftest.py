@@ -1,50 +1,137 @@
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
+from redis.asyncio import Redis
 import os
 
 
-# Set test environment variables before imports
-os.environ['REDIS_HOST'] = 'localhost'
-os.environ['REDIS_PORT'] = '6379'
-os.environ['REDIS_DB'] = '0'
-os.environ['REDIS_PASSWORD'] = ''  # No password for mock
-os.environ['SNOWTRACE_API_KEY'] = 'test'
-os.environ['ETHERSCAN_API_KEY'] = 'test'
+def pytest_configure(config):
+    """
+    Set test environment variables once, before test modules are imported.
+    
+    Values already present in the environment are kept.
+    
+    Parameters
+    ----------
+    config : pytest.Config
+        Pytest configuration
+    """
+    os.environ.setdefault('REDIS_HOST', 'localhost')
+    os.environ.setdefault('REDIS_PORT', '6379')
+    os.environ.setdefault('REDIS_DB', '0')
+    os.environ.setdefault('REDIS_PASSWORD', '')  # No password for mock
+    os.environ.setdefault('SNOWTRACE_API_KEY', 'test')
+    os.environ.setdefault('ETHERSCAN_API_KEY', 'test')
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the async Redis client."""
+    
+    def __init__(self):
+        self.data = {}
+    
+    async def ping(self):
+        return True
+    
+    async def get(self, key):
+        return self.data.get(key)
+    
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+    
+    async def set(self, key, value):
+        self.data[key] = value
+        return True
+    
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        return True
+    
+    async def aclose(self):
+        pass
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Pipeline of FakeRedis: queues writes and applies them on execute."""
+    
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self.commands = []
+    
+    def set(self, key, value):
+        self.commands.append((key, value))
+        return self
+    
+    def setex(self, key, ttl, value):
+        self.commands.append((key, value))
+        return self
+    
+    async def execute(self):
+        results = [True] * len(self.commands)
+        for key, value in self.commands:
+            self.redis.data[key] = value
+        self.commands = []
+        return results
 
 
-@pytest_asyncio.fixture
-async def mock_redis():
-    """Mock Redis client for testing."""
-    mock = AsyncMock()
-    mock.ping = AsyncMock(return_value=True)
-    mock.get = AsyncMock(return_value=None)
-    mock.setex = AsyncMock(return_value=True)
-    mock.aclose = AsyncMock()
-    return mock
+@pytest.fixture
+def fake_redis():
+    """Empty in-memory Redis client."""
+    return FakeRedis()
 
 
-@pytest_asyncio.fixture
-async def client(mock_redis):
+@pytest.fixture(scope="session")
+def mock_redis():
+    """In-memory Redis client shared by the application under test."""
+    return FakeRedis()
+
+
+@pytest.fixture(scope="session")
+def app(mock_redis):
     """
-    Fixture for async test client with mocked Redis.
+    Application with Redis patched out, built once per test session.
     
     Parameters
     ----------
-    mock_redis : AsyncMock
-        Mocked Redis client
+    mock_redis : FakeRedis
+        In-memory Redis client
+    
+    Yields
+    ------
+    FastAPI
+        Application instance
+    """
+    # Клиент Redis создаётся через Redis.from_pool, патчим именно его
+    with patch.object(Redis, 'from_pool', return_value=mock_redis):
+        from main import app
+        yield app
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client(app):
+    """
+    Async test client with mocked Redis, shared by the whole test session.
+    
+    Parameters
+    ----------
+    app : FastAPI
+        Application fixture
     
     Yields
     ------
     AsyncClient
         Async HTTP client for testing
     """
-    # Patch Redis before importing main app
-    with patch('redis.asyncio.Redis', return_value=mock_redis):
-        # Import after patching to ensure mock is used
-        from main import app
-        
-        transport = ASGITransport(app=app)
-        async with AsyncClient(transport=transport, base_url="http://test") as ac:
-            yield ac
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
@@ -51,174 +51,149 @@ class TestBlockchainAPI:
         assert data["version"] == "1.3.3.7"
     
     @pytest.mark.asyncio
-    async def test_get_balance_invalid_address_format(self, client: AsyncClient):
+    async def test_health_endpoint_not_modified(self, client: AsyncClient):
         """
-        Test that API rejects invalid Ethereum address format.
-        Verifies Pydantic validation works correctly.
+        Test that health check answers a matching If-None-Match with 304.
         
         Parameters
         ----------
         client : AsyncClient
             Test client fixture
         """
-        payload = {
-            "wallet_address": "invalid_address",
-            "block_number": 1000000,
-            "network": "avalanche"
-        }
+        response = await client.get("/health")
+        etag = response.headers["etag"]
+        length = response.headers["content-length"]
         
-        response = await client.post("/api/blockchain/balance", json=payload)
-        assert response.status_code == 422
-        data = response.json()
-        # Check that error response contains validation information
-        assert "errors" in data or "detail" in data
-    
-    @pytest.mark.asyncio
-    async def test_get_balance_invalid_address_length(self, client: AsyncClient):
-        """
-        Test that API rejects Ethereum address with invalid length.
+        for if_none_match in (etag, f'W/"other", {etag}', etag.removeprefix("W/"), "*"):
+            response = await client.get("/health", headers={"If-None-Match": if_none_match})
+            assert response.status_code == 304
+            assert response.headers["etag"] == etag
+            assert response.content == b""
         
-        Parameters
-        ----------
-        client : AsyncClient
-            Test client fixture
-        """
-        payload = {
-            "wallet_address": "0x123",  # Too short
-            "block_number": 1000000,
-            "network": "avalanche"
-        }
+        response = await client.get("/health", headers={"If-None-Match": 'W/"other", "another"'})
+        assert response.status_code == 200
         
-        response = await client.post("/api/blockchain/balance", json=payload)
-        assert response.status_code == 422
+        response = await client.head("/health")
+        assert response.status_code == 200
+        assert response.headers["content-length"] == length
+        assert response.content == b""
     
     @pytest.mark.asyncio
-    async def test_get_balance_invalid_block_number(self, client: AsyncClient):
+    async def test_static_endpoints_are_documented(self, client: AsyncClient):
         """
-        Test that API rejects negative block numbers.
+        Test that paths answered by the static middleware are listed in OpenAPI.
         
         Parameters
         ----------
         client : AsyncClient
             Test client fixture
         """
-        payload = {
-            "wallet_address": "0x0000000000000000000000000000000000000000",
-            "block_number": -1,
-            "network": "avalanche"
-        }
-        
-        response = await client.post("/api/blockchain/balance", json=payload)
-        assert response.status_code == 422
+        response = await client.get("/openapi.json")
+        assert response.status_code == 200
+        paths = response.json()["paths"]
+        health = (await client.get("/health")).json()
+        assert paths["/health"]["get"]["responses"]["200"]["content"]["application/json"]["example"] == health
+        assert "/" in paths
+        assert "/api/blockchain/balance" in paths
     
     @pytest.mark.asyncio
-    async def test_get_balance_zero_block_number(self, client: AsyncClient):
-        """
-        Test that API rejects zero block number (must be > 0).
+    @pytest.mark.parametrize("payload", [
+        pytest.param(
+            {"wallet_address": "invalid_address", "block_number": 1000000, "network": "avalanche"},
+            id="invalid-address-format"
+        ),
+        pytest.param(
+            {"wallet_address": "0x123", "block_number": 1000000, "network": "avalanche"},
+            id="invalid-address-length"
+        ),
+        pytest.param(
+            {"wallet_address": "0x" + "z" * 40, "block_number": 1000000, "network": "avalanche"},
+            id="non-hex-address"
+        ),
+        pytest.param(
+            {"wallet_address": "0x" + "a" * 40 + "\n", "block_number": 1000000, "network": "avalanche"},
+            id="address-with-trailing-newline"
+        ),
+        pytest.param(
+            {"wallet_address": "0x0000000000000000000000000000000000000000", "block_number": -1, "network": "avalanche"},
+            id="negative-block-number"
+        ),
+        pytest.param(
+            {"wallet_address": "0x0000000000000000000000000000000000000000", "block_number": 0, "network": "avalanche"},
+            id="zero-block-number"
+        ),
+        pytest.param(
+            {"wallet_address": "0x0000000000000000000000000000000000000000", "block_number": 1000000, "network": "bitcoin"},
+            id="unsupported-network"
+        ),
+        pytest.param(
+            {"wallet_address": "0x0000000000000000000000000000000000000000"},
+            id="missing-block-number"
+        )
+    ])
+    async def test_get_balance_invalid_request(self, client: AsyncClient, payload: dict):
+        """
+        Test that balance endpoint rejects invalid requests.
+        Verifies Pydantic validation works correctly.
         
         Parameters
         ----------
         client : AsyncClient
             Test client fixture
+        payload : dict
+            Invalid request body
         """
-        payload = {
-            "wallet_address": "0x0000000000000000000000000000000000000000",
-            "block_number": 0,
-            "network": "avalanche"
-        }
-        
         response = await client.post("/api/blockchain/balance", json=payload)
         assert response.status_code == 422
+        data = response.json()
+        # Check that error response contains validation information
+        assert "errors" in data or "detail" in data
     
     @pytest.mark.asyncio
-    async def test_get_balance_invalid_network(self, client: AsyncClient):
+    async def test_get_balance_batch_too_many_items(self, client: AsyncClient):
         """
-        Test that API rejects unsupported network names.
+        Test that batch endpoint rejects oversized batches.
         
         Parameters
         ----------
         client : AsyncClient
             Test client fixture
         """
-        payload = {
+        item = {
             "wallet_address": "0x0000000000000000000000000000000000000000",
             "block_number": 1000000,
-            "network": "bitcoin"  # Not supported
-        }
-        
-        response = await client.post("/api/blockchain/balance", json=payload)
-        assert response.status_code == 422
-    
-    @pytest.mark.asyncio
-    async def test_get_events_invalid_contract_address(self, client: AsyncClient):
-        """
-        Test that API rejects invalid contract address format.
-        
-        Parameters
-        ----------
-        client : AsyncClient
-            Test client fixture
-        """
-        payload = {
-            "from_block": 1000000,
-            "contract_address": "invalid_address",
             "network": "avalanche"
         }
-        
-        response = await client.post("/api/blockchain/events", json=payload)
-        assert response.status_code == 422
+        payload = {"items": [item] * 501}
     
-    @pytest.mark.asyncio
-    async def test_get_events_invalid_block_number(self, client: AsyncClient):
-        """
-        Test that API rejects negative block numbers for events endpoint.
-        
-        Parameters
-        ----------
-        client : AsyncClient
-            Test client fixture
-        """
-        payload = {
-            "from_block": -1,
-            "contract_address": "0x66357dCaCe80431aee0A7507e2E361B7e2402370",
-            "network": "avalanche"
-        }
-        
-        response = await client.post("/api/blockchain/events", json=payload)
+        response = await client.post("/api/blockchain/balance/batch", json=payload)
         assert response.status_code == 422
     
     @pytest.mark.asyncio
-    async def test_get_events_missing_required_field(self, client: AsyncClient):
-        """
-        Test that API rejects requests with missing required fields.
+    @pytest.mark.parametrize("payload", [
+        pytest.param(
+            {"from_block": 1000000, "contract_address": "invalid_address", "network": "avalanche"},
+            id="invalid-contract-address"
+        ),
+        pytest.param(
+            {"from_block": -1, "contract_address": "0x66357dCaCe80431aee0A7507e2E361B7e2402370", "network": "avalanche"},
+            id="negative-block-number"
+        ),
+        pytest.param(
+            {"contract_address": "0x66357dCaCe80431aee0A7507e2E361B7e2402370"},
+            id="missing-from-block"
+        )
+    ])
+    async def test_get_events_invalid_request(self, client: AsyncClient, payload: dict):
+        """
+        Test that events endpoint rejects invalid requests.
         
         Parameters
         ----------
         client : AsyncClient
             Test client fixture
+        payload : dict
+            Invalid request body
         """
-        payload = {
-            "contract_address": "0x66357dCaCe80431aee0A7507e2E361B7e2402370",
-            # missing from_block
-        }
-        
         response = await client.post("/api/blockchain/events", json=payload)
         assert response.status_code == 422
-    
-    @pytest.mark.asyncio
-    async def test_get_balance_missing_required_field(self, client: AsyncClient):
-        """
-        Test that API rejects balance requests with missing required fields.
-        
-        Parameters
-        ----------
-        client : AsyncClient
-            Test client fixture
-        """
-        payload = {
-            "wallet_address": "0x0000000000000000000000000000000000000000",
-            # missing block_number
-        }
-        
-        response = await client.post("/api/blockchain/balance", json=payload)
-        assert response.status_code == 422
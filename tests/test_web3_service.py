@@ -0,0 +1,956 @@
+import asyncio
+import logging
+import multiprocessing
+import orjson
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic, keccak
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from web3._utils.events import get_event_data
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+from blockchain.abi_service import ABIService
+from blockchain.entities import WalletBalanceEntity
+from blockchain.schemas import GetBalanceRequest
+from blockchain.services import (
+    Web3Service,
+    _compile_event_abi,
+    _decode_event_args,
+    _decode_log_rows_in_worker,
+    _EventTableMissing,
+    init_decode_worker
+)
+from blockchain.usecases import GetContractEventsUseCase, GetWalletBalancesUseCase
+from core.redis.providers import CacheService
+
+
+CONTRACT_ADDRESS = "0x66357dCaCe80431aee0A7507e2E361B7e2402370"
+
+TRANSFER_ABI = {
+    "type": "event",
+    "name": "Transfer",
+    "anonymous": False,
+    "inputs": [
+        {"name": "from", "type": "address", "indexed": True},
+        {"name": "to", "type": "address", "indexed": True},
+        {"name": "value", "type": "uint256", "indexed": False}
+    ]
+}
+
+
+def make_transfer_log(block_number: int, log_index: int, value: int) -> dict:
+    """
+    Build raw Transfer log as returned by eth_getLogs over JSON-RPC.
+    
+    Parameters
+    ----------
+    block_number : int
+        Block number of the log
+    log_index : int
+        Log index in the block
+    value : int
+        Transferred amount
+        
+    Returns
+    -------
+    dict
+        Raw log entry
+    """
+    return {
+        "address": CONTRACT_ADDRESS,
+        "topics": [
+            HexBytes(event_abi_to_log_topic(TRANSFER_ABI)).to_0x_hex(),
+            "0x" + "00" * 12 + "11" * 20,
+            "0x" + "00" * 12 + "22" * 20
+        ],
+        "data": "0x" + encode(["uint256"], [value]).hex(),
+        "blockNumber": hex(block_number),
+        "blockHash": "0x" + "02" * 32,
+        "transactionHash": "0x" + f"{log_index + 1:02x}" * 32,
+        "transactionIndex": "0x0",
+        "logIndex": hex(log_index),
+        "removed": False
+    }
+
+
+class FakeRPCProvider(AsyncJSONBaseProvider):
+    """
+    JSON-RPC provider answering from memory, for single and batch requests.
+    
+    Parameters
+    ----------
+    logs : list[dict]
+        Raw logs to serve
+    block_number : int
+        Current chain head
+    """
+    
+    def __init__(self, logs: list[dict], block_number: int):
+        super().__init__()
+        self.logs = logs
+        self.block_number = block_number
+        # None — баланс равен запрошенному блоку
+        self.balance = None
+        self.storage = {}
+        self.max_logs = None
+        self.max_range = None
+        self.fail_below = None
+        # eth_getLogs с fromBlock ниже stall_below ждут unstall
+        self.stall_below = None
+        self.unstall = asyncio.Event()
+        self.get_logs_calls = []
+        self.rejected_get_logs = 0
+        self.http_requests = 0
+        self.batch_sizes = []
+    
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+    
+    async def make_request(self, method: str, params: list) -> dict:
+        self.http_requests += 1
+        await self._stall([(method, params)])
+        return self._response(0, method, params)
+    
+    async def make_batch_request(self, requests: list) -> list[dict]:
+        self.http_requests += 1
+        self.batch_sizes.append(len(requests))
+        await self._stall(requests)
+        return [
+            self._response(i, method, params)
+            for i, (method, params) in enumerate(requests)
+        ]
+    
+    async def _stall(self, requests: list) -> None:
+        if self.stall_below is not None and any(
+            method == "eth_getLogs" and int(params[0]["fromBlock"], 16) < self.stall_below
+            for method, params in requests
+        ):
+            await self.unstall.wait()
+    
+    def _response(self, request_id: int, method: str, params: list) -> dict:
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": request_id, "result": hex(self.block_number)}
+        if method == "eth_getBalance":
+            return {"jsonrpc": "2.0", "id": request_id, "result": hex(int(params[1], 16) if self.balance is None else self.balance)}
+        if method == "eth_getStorageAt":
+            value = self.storage.get(int(params[1], 16), "0x" + "00" * 32)
+            return {"jsonrpc": "2.0", "id": request_id, "result": value}
+        if method == "eth_getLogs":
+            filter_params = params[0]
+            self.get_logs_calls.append(filter_params)
+            if self.fail_below is not None and int(filter_params["fromBlock"], 16) < self.fail_below:
+                return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32000, "message": "upstream timeout"}}
+            block_range = int(filter_params["toBlock"], 16) - int(filter_params["fromBlock"], 16) + 1
+            if self.max_range is not None and block_range > self.max_range:
+                self.rejected_get_logs += 1
+                return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32000, "message": "block range is too large"}}
+            topic0 = filter_params.get("topics", [None])[0]
+            logs = [
+                log for log in self.logs
+                if int(filter_params["fromBlock"], 16) <= int(log["blockNumber"], 16) <= int(filter_params["toBlock"], 16)
+                and (topic0 is None or log["topics"][0] in topic0)
+            ]
+            if self.max_logs is not None and len(logs) > self.max_logs:
+                self.rejected_get_logs += 1
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "error": {"code": -32005, "message": f"query returned more than {self.max_logs} results"}
+                }
+            return {"jsonrpc": "2.0", "id": request_id, "result": logs}
+        raise NotImplementedError(method)
+
+
+class FakeExplorerSession:
+    """
+    aiohttp session stand-in for the explorer getabi endpoint.
+    
+    Parameters
+    ----------
+    abis : dict[str, list[dict]]
+        Verified ABIs by lowercase address
+    error : str
+        Explorer result for any other address
+    """
+    
+    def __init__(self, abis: dict[str, list[dict]], error: str = "Contract source code not verified"):
+        self.abis = abis
+        self.error = error
+        self.requests = []
+    
+    def get(self, url: str, params: dict):
+        address = params["address"].lower()
+        self.requests.append(address)
+        if address in self.abis:
+            payload = {"status": "1", "message": "OK", "result": orjson.dumps(self.abis[address]).decode()}
+        else:
+            payload = {"status": "0", "message": "NOTOK", "result": self.error}
+        response = MagicMock(status=200, headers={})
+        response.read = AsyncMock(return_value=orjson.dumps(payload))
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=response)
+        context.__aexit__ = AsyncMock(return_value=False)
+        return context
+
+
+@pytest.fixture
+def web3_client():
+    """Real AsyncWeb3 on top of an in-memory JSON-RPC provider."""
+    return AsyncWeb3(FakeRPCProvider(
+        logs=[make_transfer_log(4500, 1, 2 ** 200), make_transfer_log(10, 0, 5)],
+        block_number=5000
+    ))
+
+
+@pytest.fixture
+def cache_service():
+    """Cache service that always misses."""
+    cache = AsyncMock()
+    cache.get = AsyncMock(return_value=None)
+    cache.get_many_packed = AsyncMock(side_effect=lambda keys: [None] * len(keys))
+    cache.set = AsyncMock(return_value=True)
+    return cache
+
+
+class TestWeb3Service:
+    """
+    Unit tests for Web3Service with an in-memory blockchain client.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_get_contract_events_decodes_logs(self, web3_client, cache_service):
+        """
+        Test that logs are decoded by topic0 and returned in block order.
+        
+        Parameters
+        ----------
+        web3_client : AsyncWeb3
+            Web3 client fixture
+        cache_service : AsyncMock
+            Cache service fixture
+        """
+        service = Web3Service(
+            web3_clients={"avalanche": web3_client},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        
+        events = [event async for event in service.get_contract_events(
+            contract_address=CONTRACT_ADDRESS.lower(),
+            from_block=1,
+            network="avalanche",
+            contract=contract
+        )]
+        
+        assert [(e.block_number, e.log_index) for e in events] == [(10, 0), (4500, 1)]
+        assert all(e.event_name == "Transfer" for e in events)
+        assert events[0].args["value"] == 5
+        assert events[1].args["value"] == 2 ** 200
+        assert events[1].args["to"] == "0x2222222222222222222222222222222222222222"
+        assert all(
+            call["topics"] == [[HexBytes(event_abi_to_log_topic(TRANSFER_ABI)).to_0x_hex()]]
+            for call in web3_client.provider.get_logs_calls
+        )
+        # eth_blockNumber + три соседних чанка одним слитым eth_getLogs
+        assert [
+            (call["fromBlock"], call["toBlock"]) for call in web3_client.provider.get_logs_calls
+        ] == [(hex(1), hex(5000))]
+        assert web3_client.provider.http_requests == 2
+    
+    @pytest.mark.asyncio
+    async def test_get_contract_events_from_cached_chunks(self, web3_client, fake_redis):
+        """
+        Test that chunks served from cache decode to the same events as fresh logs.
+        
+        Parameters
+        ----------
+        web3_client : AsyncWeb3
+            Web3 client fixture
+        fake_redis : FakeRedis
+            In-memory Redis fixture
+        """
+        service = Web3Service(
+            web3_clients={"avalanche": web3_client},
+            logger=logging.getLogger("test"),
+            cache_service=CacheService(fake_redis)
+        )
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        
+        fresh = [event async for event in service.get_contract_events(
+            contract_address=CONTRACT_ADDRESS.lower(),
+            from_block=1,
+            network="avalanche",
+            contract=contract
+        )]
+        rpc_calls = len(web3_client.provider.get_logs_calls)
+        cached = [event async for event in service.get_contract_events(
+            contract_address=CONTRACT_ADDRESS.lower(),
+            from_block=1,
+            network="avalanche",
+            contract=contract
+        )]
+        
+        assert len(web3_client.provider.get_logs_calls) == rpc_calls
+        assert [e.model_dump() for e in cached] == [e.model_dump() for e in fresh]
+    
+    @pytest.mark.asyncio
+    async def test_get_contract_events_splits_too_large_range(self, cache_service):
+        """
+        Test that a range rejected for returning too many logs is split, not dropped.
+        
+        Parameters
+        ----------
+        cache_service : AsyncMock
+            Cache service fixture
+        """
+        provider = FakeRPCProvider(
+            logs=[make_transfer_log(block, 0, block) for block in range(100, 110)],
+            block_number=1000
+        )
+        provider.max_logs = 3
+        service = Web3Service(
+            web3_clients={"avalanche": AsyncWeb3(provider)},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        
+        events = [event async for event in service.get_contract_events(
+            contract_address=CONTRACT_ADDRESS.lower(),
+            from_block=1,
+            network="avalanche",
+            contract=contract
+        )]
+        
+        assert [e.block_number for e in events] == list(range(100, 110))
+    
+    @pytest.mark.asyncio
+    async def test_get_contract_events_stops_merging_chunks_that_are_too_dense(self, cache_service):
+        """
+        Test that merged chunks rejected by the node are refetched one by one, and not merged again.
+        
+        Parameters
+        ----------
+        cache_service : AsyncMock
+            Cache service fixture
+        """
+        provider = FakeRPCProvider(
+            logs=[make_transfer_log(block, 0, block) for block in (10, 11, 2500, 2501, 4500)],
+            block_number=5000
+        )
+        provider.max_logs = 3
+        service = Web3Service(
+            web3_clients={"avalanche": AsyncWeb3(provider)},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        
+        rejected = []
+        for _ in range(2):
+            before = provider.rejected_get_logs
+            events = [event async for event in service.get_contract_events(
+                contract_address=CONTRACT_ADDRESS.lower(),
+                from_block=1,
+                network="avalanche",
+                contract=contract
+            )]
+            rejected.append(provider.rejected_get_logs - before)
+            assert [e.block_number for e in events] == [10, 11, 2500, 2501, 4500]
+        
+        assert rejected == [1, 0]
+    
+    @pytest.mark.asyncio
+    async def test_get_contract_events_stops_merging_on_range_capped_node(self, cache_service):
+        """
+        Test that once a node rejects merged ranges, later batches are not merged again.
+        
+        Parameters
+        ----------
+        cache_service : AsyncMock
+            Cache service fixture
+        """
+        provider = FakeRPCProvider(
+            logs=[make_transfer_log(block, 0, block) for block in range(5, 400_000, 50_000)],
+            block_number=399_999
+        )
+        provider.max_range = 2048
+        service = Web3Service(
+            web3_clients={"avalanche": AsyncWeb3(provider)},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        # Батчи по одному: каждый следующий видит подсказки предыдущего
+        service.LOGS_BATCHES_IN_FLIGHT = 1
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        
+        calls = []
+        for _ in range(2):
+            before = (len(provider.get_logs_calls), provider.rejected_get_logs)
+            events = [event async for event in service.get_contract_events(
+                contract_address=CONTRACT_ADDRESS.lower(),
+                from_block=0,
+                network="avalanche",
+                contract=contract
+            )]
+            calls.append((len(provider.get_logs_calls) - before[0], provider.rejected_get_logs - before[1]))
+            assert [e.block_number for e in events] == list(range(5, 400_000, 50_000))
+        
+        # 200 чанков: отвергается только первый слитый батч, дальше по запросу на чанк
+        assert calls == [(207, 7), (200, 0)]
+    
+    @pytest.mark.asyncio
+    async def test_get_contract_events_merges_again_after_dense_contract_turns_quiet(self, cache_service):
+        """
+        Test that rejections for too many results do not cap merging for good.
+        
+        Parameters
+        ----------
+        cache_service : AsyncMock
+            Cache service fixture
+        """
+        provider = FakeRPCProvider(
+            logs=[make_transfer_log(block, 0, block) for block in range(10, 15)],
+            block_number=399_999
+        )
+        provider.max_logs = 3
+        service = Web3Service(
+            web3_clients={"avalanche": AsyncWeb3(provider)},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        service.LOGS_BATCHES_IN_FLIGHT = 1
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        
+        calls = []
+        for logs in (provider.logs, [make_transfer_log(10, 0, 0)]):
+            provider.logs = logs
+            before = (len(provider.get_logs_calls), provider.rejected_get_logs)
+            events = [event async for event in service.get_contract_events(
+                contract_address=CONTRACT_ADDRESS.lower(),
+                from_block=0,
+                network="avalanche",
+                contract=contract
+            )]
+            calls.append((len(provider.get_logs_calls) - before[0], provider.rejected_get_logs - before[1]))
+            assert len(events) == len(logs)
+        
+        # Подсказка ослабляется на редких батчах: второй проход снова сливает чанки, а не 200 запросов по одному
+        assert calls[1] == (28, 0)
+    
+    @pytest.mark.asyncio
+    async def test_get_contract_events_pauses_fetching_behind_stalled_first_chunk(self, cache_service):
+        """
+        Test that a slow first chunk holds back fetching instead of buffering later chunks.
+        
+        Parameters
+        ----------
+        cache_service : AsyncMock
+            Cache service fixture
+        """
+        provider = FakeRPCProvider(
+            logs=[make_transfer_log(block, 0, block) for block in range(5, 20_000, 2000)],
+            block_number=19_999
+        )
+        provider.stall_below = 2000
+        service = Web3Service(
+            web3_clients={"avalanche": AsyncWeb3(provider)},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        service.LOGS_BATCH_SIZE = 1
+        service.LOGS_BATCHES_IN_FLIGHT = 2
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        
+        async def collect() -> list:
+            return [event async for event in service.get_contract_events(
+                contract_address=CONTRACT_ADDRESS.lower(),
+                from_block=0,
+                network="avalanche",
+                contract=contract
+            )]
+        
+        consumer = asyncio.ensure_future(collect())
+        for _ in range(50):
+            await asyncio.sleep(0)
+        # Первый чанк завис, второй загружен, остальные 8 ждут слота
+        assert [call["fromBlock"] for call in provider.get_logs_calls] == [hex(2000)]
+        
+        provider.unstall.set()
+        events = await consumer
+        assert [e.block_number for e in events] == list(range(5, 20_000, 2000))
+        assert len(provider.get_logs_calls) == 10
+    
+    @pytest.mark.asyncio
+    async def test_get_contract_events_reuses_learned_range_size(self, cache_service):
+        """
+        Test that a contract known to be dense is fetched with fewer rejected calls next time.
+        
+        Parameters
+        ----------
+        cache_service : AsyncMock
+            Cache service fixture
+        """
+        provider = FakeRPCProvider(
+            logs=[make_transfer_log(block, 0, block) for block in range(100, 110)],
+            block_number=1000
+        )
+        provider.max_logs = 3
+        service = Web3Service(
+            web3_clients={"avalanche": AsyncWeb3(provider)},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        
+        rejected = []
+        for _ in range(2):
+            before = provider.rejected_get_logs
+            events = [event async for event in service.get_contract_events(
+                contract_address=CONTRACT_ADDRESS.lower(),
+                from_block=1,
+                network="avalanche",
+                contract=contract
+            )]
+            rejected.append(provider.rejected_get_logs - before)
+            assert [e.block_number for e in events] == list(range(100, 110))
+        
+        assert rejected[1] < rejected[0]
+    
+    @pytest.mark.asyncio
+    async def test_get_contract_events_decodes_in_process_pool(self, web3_client, cache_service):
+        """
+        Test that chunks decoded in a worker process match inline decoding.
+        
+        Parameters
+        ----------
+        web3_client : AsyncWeb3
+            Web3 client fixture
+        cache_service : AsyncMock
+            Cache service fixture
+        """
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        inline_service = Web3Service(
+            web3_clients={"avalanche": web3_client},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        inline = [event async for event in inline_service.get_contract_events(
+            contract_address=CONTRACT_ADDRESS.lower(),
+            from_block=1,
+            network="avalanche",
+            contract=contract
+        )]
+        
+        # Тот же способ запуска воркеров, что и в BlockchainProvider
+        context = multiprocessing.get_context("forkserver")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=init_decode_worker) as executor:
+            service = Web3Service(
+                web3_clients={"avalanche": web3_client},
+                logger=logging.getLogger("test"),
+                cache_service=cache_service,
+                decode_executor=executor
+            )
+            service.DECODE_OFFLOAD_MIN_LOGS = 1
+            offloaded = [event async for event in service.get_contract_events(
+                contract_address=CONTRACT_ADDRESS.lower(),
+                from_block=1,
+                network="avalanche",
+                contract=contract
+            )]
+        
+        assert [e.model_dump() for e in offloaded] == [e.model_dump() for e in inline]
+    
+    def test_decode_worker_receives_event_table_once(self):
+        """
+        Test that a decode worker asks for an unknown event table and reuses it afterwards.
+        """
+        service = Web3Service(web3_clients={}, logger=logging.getLogger("test"), cache_service=None)
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        table_key, sig_to_event = service._get_event_table(contract)
+        logs = [{
+            **log,
+            "topics": [HexBytes(topic) for topic in log["topics"]],
+            "data": HexBytes(log["data"]),
+            "transactionHash": HexBytes(log["transactionHash"]),
+            "blockNumber": int(log["blockNumber"], 16),
+            "logIndex": int(log["logIndex"], 16)
+        } for log in (make_transfer_log(7, 0, 2**200),)]
+        
+        init_decode_worker()
+        with pytest.raises(_EventTableMissing):
+            _decode_log_rows_in_worker(table_key, logs)
+        
+        rows, errors = _decode_log_rows_in_worker(table_key, logs, sig_to_event)
+        assert _decode_log_rows_in_worker(table_key, logs) == (rows, errors)
+        assert errors == []
+        assert rows[0][4]["value"] == 2**200
+        
+        # Та же ABI в другой фабрике — тот же ключ, повторно таблица не нужна
+        other = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[dict(TRANSFER_ABI)])
+        assert service._get_event_table(other)[0] == table_key
+    
+    def test_precompiled_decoder_matches_web3(self):
+        """
+        Test that the precompiled event decoder gives the same args as web3's get_event_data,
+        including structs, address arrays and hashed indexed strings.
+        """
+        event_abi = {
+            "type": "event",
+            "name": "Registered",
+            "anonymous": False,
+            "inputs": [
+                {"name": "owner", "type": "address", "indexed": True},
+                {"name": "tag", "type": "string", "indexed": True},
+                {
+                    "name": "params",
+                    "type": "tuple",
+                    "indexed": False,
+                    "components": [
+                        {"name": "amount", "type": "uint256"},
+                        {"name": "recipients", "type": "address[]"}
+                    ]
+                }
+            ]
+        }
+        log = {
+            "topics": [
+                HexBytes(event_abi_to_log_topic(event_abi)),
+                HexBytes(b"\x00" * 12 + b"\xab" * 20),
+                HexBytes(keccak(text="tag"))
+            ],
+            "data": HexBytes(encode(["(uint256,address[])"], [(2 ** 200, ["0x" + "cd" * 20])])),
+            "logIndex": 0,
+            "transactionIndex": 0,
+            "transactionHash": HexBytes(b"\x01" * 32),
+            "address": CONTRACT_ADDRESS,
+            "blockHash": HexBytes(b"\x02" * 32),
+            "blockNumber": 1
+        }
+        
+        expected = get_event_data(AsyncWeb3().codec, event_abi, log)["args"]
+        
+        assert _decode_event_args(_compile_event_abi(event_abi), log["topics"], log["data"]) == dict(expected)
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("balance_wei", [0, 1, 10 ** 18, 123456789012345678901, 2 ** 200 + 7])
+    async def test_get_balance_matches_decimal_conversion(self, web3_client, cache_service, balance_wei):
+        """
+        Test that wei -> ether conversion matches the Decimal-based `from_wei` result.
+        
+        Parameters
+        ----------
+        web3_client : AsyncWeb3
+            Web3 client fixture
+        cache_service : AsyncMock
+            Cache service fixture
+        balance_wei : int
+            Balance returned by the node
+        """
+        web3_client.provider.balance = balance_wei
+        service = Web3Service(
+            web3_clients={"avalanche": web3_client},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        
+        balance = await service.get_balance_at_block(
+            wallet_address=CONTRACT_ADDRESS.lower(),
+            block_number=100,
+            network="avalanche"
+        )
+        
+        assert balance.balance_wei == balance_wei
+        assert balance.balance_eth == pytest.approx(float(Decimal(balance_wei) / Decimal(10 ** 18)), rel=1e-15)
+
+    
+    @pytest.mark.asyncio
+    async def test_get_balances_at_blocks_splits_batches(self, web3_client, cache_service):
+        """
+        Test that many balance queries go out in several bounded batches and stay in order.
+        
+        Parameters
+        ----------
+        web3_client : AsyncWeb3
+            Web3 client fixture (balance equals the queried block)
+        cache_service : AsyncMock
+            Cache service fixture
+        """
+        service = Web3Service(
+            web3_clients={"avalanche": web3_client},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        queries = [(CONTRACT_ADDRESS.lower(), block) for block in range(1, 121)]
+        
+        balances = await service.get_balances_at_blocks(queries=queries, network="avalanche")
+        
+        assert [(b.block_number, b.balance_wei) for b in balances] == [(block, block) for block in range(1, 121)]
+        assert sorted(web3_client.provider.batch_sizes) == [20, 50, 50]
+
+class TestGetWalletBalancesUseCase:
+    """
+    Unit tests for the batch balance use case.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_batch_keeps_order_and_groups_misses_by_network(self, fake_redis):
+        """
+        Test that cached items are not refetched, misses go out as one batch
+        per network and results stay aligned with the input.
+        
+        Parameters
+        ----------
+        fake_redis : FakeRedis
+            In-memory Redis fixture
+        """
+        wallet = "0x" + "1" * 40
+        items = [
+            GetBalanceRequest(wallet_address=wallet, block_number=1, network="avalanche"),
+            GetBalanceRequest(wallet_address=wallet, block_number=2, network="ethereum"),
+            GetBalanceRequest(wallet_address=wallet, block_number=3, network="avalanche"),
+        ]
+        cache = CacheService(fake_redis)
+        await cache.set(
+            f"balance:avalanche:{wallet}:1",
+            {
+                "wallet_address": wallet,
+                "block_number": 1,
+                "balance_wei": 7,
+                "balance_eth": 7 / 10 ** 18,
+                "network": "avalanche"
+            }
+        )
+        
+        async def get_balances_at_blocks(queries, network):
+            return [
+                WalletBalanceEntity(
+                    wallet_address=address,
+                    block_number=block,
+                    balance_wei=block * 100,
+                    balance_eth=block * 100 / 10 ** 18,
+                    network=network
+                )
+                for address, block in queries
+            ]
+        
+        web3_service = AsyncMock()
+        web3_service.get_balances_at_blocks = AsyncMock(side_effect=get_balances_at_blocks)
+        use_case = GetWalletBalancesUseCase(web3_service=web3_service, cache_service=cache)
+        
+        response = await use_case(items=items)
+        
+        assert [(b.network, b.block_number, b.balance_wei) for b in response.balances] == [
+            ("avalanche", 1, 7), ("ethereum", 2, 200), ("avalanche", 3, 300)
+        ]
+        calls = {
+            call.kwargs["network"]: call.kwargs["queries"]
+            for call in web3_service.get_balances_at_blocks.await_args_list
+        }
+        assert calls == {"avalanche": [(wallet, 3)], "ethereum": [(wallet, 2)]}
+        assert await cache.get_many([
+            f"balance:ethereum:{wallet}:2", f"balance:avalanche:{wallet}:3"
+        ]) == [b.model_dump() for b in response.balances[1:]]
+
+
+class TestCacheService:
+    """
+    Unit tests for CacheService JSON round trips.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_integers_wider_than_64_bits_round_trip(self, fake_redis):
+        """
+        Test that uint256 values and hex strings with long digit runs survive the cache.
+        
+        Parameters
+        ----------
+        fake_redis : FakeRedis
+            In-memory Redis fixture
+        """
+        cache = CacheService(fake_redis)
+        value = {"value": 2 ** 200, "small": 5, "hash": "0x" + "1" * 64, "eth": 1.5e-18}
+        
+        await cache.set("key", value)
+        await cache.set_many({"other": value})
+        
+        assert isinstance(fake_redis.data["key"], bytes)
+        assert await cache.get("key") == value
+        assert await cache.get_many(["key", "other", "missing"]) == [value, value, None]
+
+class TestGetContractEventsUseCase:
+    """
+    Unit tests for the contract events use case.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_finalized_history_is_reused_when_head_moves(self, web3_client, cache_service, fake_redis):
+        """
+        Test that after the chain head moves only the tail past the cached history is fetched.
+        
+        Parameters
+        ----------
+        web3_client : AsyncWeb3
+            Web3 client fixture
+        cache_service : AsyncMock
+            Cache service fixture (chunk cache of the service always misses)
+        fake_redis : FakeRedis
+            In-memory Redis fixture for the use case cache
+        """
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        abi_service = AsyncMock()
+        abi_service.get_contract = AsyncMock(return_value=contract)
+        use_case = GetContractEventsUseCase(
+            web3_service=Web3Service(
+                web3_clients={"avalanche": web3_client},
+                logger=logging.getLogger("test"),
+                cache_service=cache_service
+            ),
+            cache_service=CacheService(fake_redis),
+            abi_service=abi_service,
+            settings=MagicMock()
+        )
+        provider = web3_client.provider
+        
+        first = await use_case(contract_address=CONTRACT_ADDRESS.lower(), from_block=1, network="avalanche")
+        provider.block_number = 5010
+        provider.logs.append(make_transfer_log(5005, 0, 9))
+        provider.get_logs_calls.clear()
+        second = await use_case(contract_address=CONTRACT_ADDRESS.lower(), from_block=1, network="avalanche")
+        
+        assert [e.block_number for e in first.events] == [10, 4500]
+        assert [e.block_number for e in second.events] == [10, 4500, 5005]
+        assert second.total_events == 3
+        # История до блока 3999 финальна и берётся из кеша
+        assert all(int(call["fromBlock"], 16) >= 4000 for call in provider.get_logs_calls)
+        
+        provider.get_logs_calls.clear()
+        third = await use_case(contract_address=CONTRACT_ADDRESS.lower(), from_block=1, network="avalanche")
+        
+        # Тот же блок — весь ответ из кеша, uint256 не теряет точности
+        assert provider.get_logs_calls == []
+        assert third == second
+        assert third.events[1].args["value"] == 2 ** 200
+
+    
+    @pytest.mark.asyncio
+    async def test_history_with_failed_chunks_is_not_cached(self, web3_client, cache_service, fake_redis):
+        """
+        Test that history fetched while the node was failing is refetched once the node recovers.
+        
+        Parameters
+        ----------
+        web3_client : AsyncWeb3
+            Web3 client fixture
+        cache_service : AsyncMock
+            Cache service fixture (chunk cache of the service always misses)
+        fake_redis : FakeRedis
+            In-memory Redis fixture for the use case cache
+        """
+        contract = AsyncWeb3().eth.contract(address=CONTRACT_ADDRESS, abi=[TRANSFER_ABI])
+        abi_service = AsyncMock()
+        abi_service.get_contract = AsyncMock(return_value=contract)
+        web3_service = Web3Service(
+            web3_clients={"avalanche": web3_client},
+            logger=logging.getLogger("test"),
+            cache_service=cache_service
+        )
+        web3_service.LOGS_MAX_RETRIES = 0
+        use_case = GetContractEventsUseCase(
+            web3_service=web3_service,
+            cache_service=CacheService(fake_redis),
+            abi_service=abi_service,
+            settings=MagicMock()
+        )
+        provider = web3_client.provider
+        
+        provider.fail_below = 2000
+        first = await use_case(contract_address=CONTRACT_ADDRESS.lower(), from_block=1, network="avalanche")
+        provider.fail_below = None
+        second = await use_case(contract_address=CONTRACT_ADDRESS.lower(), from_block=1, network="avalanche")
+        
+        assert [e.block_number for e in first.events] == [4500]
+        assert [e.block_number for e in second.events] == [10, 4500]
+
+
+class TestABIService:
+    """
+    Unit tests for ABIService explorer handling.
+    """
+    
+    @pytest.mark.asyncio
+    async def test_explorer_error_is_not_cached_as_unverified(self, fake_redis):
+        """
+        Test that an explorer error such as an invalid API key is not cached as a missing ABI,
+        while an unverified contract is.
+        
+        Parameters
+        ----------
+        fake_redis : FakeRedis
+            In-memory Redis fixture
+        """
+        session = FakeExplorerSession({}, error="Invalid API Key")
+        service = ABIService(
+            cache_service=CacheService(fake_redis),
+            logger=logging.getLogger("test"),
+            session=session
+        )
+        
+        for _ in range(2):
+            assert await service.get_abi(CONTRACT_ADDRESS, "avalanche", "bad-key", None) == []
+        assert len(session.requests) == 2
+        assert fake_redis.data == {}
+        
+        session.error = "Contract source code not verified"
+        for _ in range(2):
+            assert await service.get_abi(CONTRACT_ADDRESS, "avalanche", "key", None) == []
+        assert len(session.requests) == 3
+    
+    @pytest.mark.asyncio
+    async def test_proxy_upgrade_is_picked_up_after_implementation_cache_expires(self, fake_redis):
+        """
+        Test that a cached proxy resolves its implementation again, so an upgrade
+        changes the ABI without refetching the proxy itself.
+        
+        Parameters
+        ----------
+        fake_redis : FakeRedis
+            In-memory Redis fixture
+        """
+        impl_a = "0x" + "aa" * 20
+        impl_b = "0x" + "bb" * 20
+        proxy_abi = [
+            {"type": "function", "name": name, "inputs": [], "outputs": [], "stateMutability": "nonpayable"}
+            for name in ("implementation", "upgradeTo")
+        ]
+        session = FakeExplorerSession({
+            CONTRACT_ADDRESS.lower(): proxy_abi,
+            impl_a: [TRANSFER_ABI],
+            impl_b: [TRANSFER_ABI, {**TRANSFER_ABI, "name": "Approval"}]
+        })
+        service = ABIService(
+            cache_service=CacheService(fake_redis),
+            logger=logging.getLogger("test"),
+            session=session
+        )
+        provider = FakeRPCProvider(logs=[], block_number=1)
+        slot = 0x360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc
+        provider.storage[slot] = "0x" + "00" * 12 + impl_a[2:]
+        web3_client = AsyncWeb3(provider)
+        
+        for _ in range(2):
+            assert await service.get_abi(CONTRACT_ADDRESS, "avalanche", "key", web3_client) == [TRANSFER_ABI]
+        assert session.requests == [CONTRACT_ADDRESS.lower(), impl_a]
+        
+        provider.storage[slot] = "0x" + "00" * 12 + impl_b[2:]
+        # Истечение TTL адреса имплементации
+        del fake_redis.data[f"impl:avalanche:{CONTRACT_ADDRESS.lower()}"]
+        abi = await service.get_abi(CONTRACT_ADDRESS, "avalanche", "key", web3_client)
+        
+        assert [item["name"] for item in abi] == ["Transfer", "Approval"]
+        assert session.requests == [CONTRACT_ADDRESS.lower(), impl_a, impl_b]